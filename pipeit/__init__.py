@@ -3,21 +3,58 @@ __version__ = ''
 
 from .utils import *
 from .wrapper import *
-from .timer import timeit
+from .plan import Plan
+from .parallel import ParallelMap, ConcurrentMap
+from .aio import AMap, AFilter, AReduce
+from .vector import VMap, VFilter, ArrayStream
+from .window import Tumbling, Sliding, TimeWindow, WindowStats
+from .external import GroupBy, Sort, TopK, Join
+from .distinct import Distinct
+from .profiler import Profiled
+from .timer import timeit, atimeit, TimeitResult, MemoryUsage, LoopLag
 from .io import *
 from .decorators import cache, retry
 
 __all__ = (
     'timeit',
+    'atimeit',
+    'TimeitResult',
+    'MemoryUsage',
+    'LoopLag',
     'PIPE',
     'END',
     'Filter',
     'Map',
     'Reduce',
+    'Take',
+    'Fused',
+    'Plan',
+    'ParallelMap',
+    'ConcurrentMap',
+    'AMap',
+    'AFilter',
+    'AReduce',
+    'VMap',
+    'VFilter',
+    'ArrayStream',
+    'Tumbling',
+    'Sliding',
+    'TimeWindow',
+    'WindowStats',
+    'GroupBy',
+    'Sort',
+    'TopK',
+    'Join',
+    'Distinct',
+    'Profiled',
     'Read',
     'Write',
     'ReadB',
     'WriteB',
+    'ReadLines',
+    'ReadLinesB',
+    'ReadChunks',
+    'ReadChunksB',
     'cache',
     'retry'
 )
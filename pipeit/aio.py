@@ -0,0 +1,142 @@
+import asyncio
+from collections import deque
+from inspect import isawaitable
+from typing import Callable, Awaitable, AsyncIterator, Iterable, Any, Union
+from .base import AbstractSelfModifiedClass, _MISSING
+
+
+def _aiter(source: Union[Iterable, AsyncIterator]) -> AsyncIterator:
+    if hasattr(source, '__aiter__'):
+        return source.__aiter__()
+    return _from_sync(source)
+
+
+async def _from_sync(source: Iterable) -> AsyncIterator:
+    for item in source:
+        yield item
+
+
+async def _call(func: Callable, *args: Any) -> Any:
+    # plain functions and coroutine functions are both accepted
+    result = func(*args)
+    if isawaitable(result):
+        result = await result
+    return result
+
+
+async def _amap(func: Callable, source: Union[Iterable, AsyncIterator], concurrency: int, ordered: bool) -> AsyncIterator:
+    it = _aiter(source)
+    if concurrency == 1:
+        async for item in it:
+            yield await _call(func, item)
+        return
+    pending = deque()
+    exhausted = False
+    try:
+        while True:
+            while not exhausted and len(pending) < concurrency:
+                try:
+                    item = await it.__anext__()
+                except StopAsyncIteration:
+                    exhausted = True
+                    break
+                pending.append(asyncio.ensure_future(_call(func, item)))
+            if not pending:
+                return
+            if ordered:
+                yield await pending.popleft()
+            else:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    pending.remove(task)
+                for task in done:
+                    yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+class AbstractAsyncStage(AbstractSelfModifiedClass):
+    '''
+    Async stages accept sync or async iterables and plain or coroutine functions,
+    at most `concurrency` calls of a stage are awaited at the same time.
+    '''
+
+    def __init__(self, func: Callable, concurrency: int = 1, ordered: bool = True):
+        if concurrency < 1:
+            raise ValueError("Parameter concurrency must >= 1")
+        self._func = func
+        self._storage = None
+        self._concurrency = concurrency
+        self._ordered = ordered
+
+    def __iter__(self):
+        raise TypeError("Async stage must be iterated with `async for`.")
+
+    def __aiter__(self) -> AsyncIterator:
+        return self._storage.__aiter__()
+
+    def __await__(self):
+        # `await (source | AMap(f) | AReduce(g))`
+        return self._storage.__await__()
+
+
+class AMap(AbstractAsyncStage):
+    '''
+    Usage:
+    >>> async for page in urls | AMap(fetch, concurrency=100):
+    >>>     ...
+    '''
+
+    def _exec(self, _iter: Union[Iterable, AsyncIterator]) -> AsyncIterator:
+        return _amap(self._func, _iter, self._concurrency, self._ordered)
+
+
+class AFilter(AbstractAsyncStage):
+    '''
+    Usage:
+    >>> alive = [host async for host in hosts | AFilter(ping, concurrency=50)]
+    '''
+
+    def _exec(self, _iter: Union[Iterable, AsyncIterator]) -> AsyncIterator:
+        return self._filter(_iter)
+
+    async def _filter(self, _iter: Union[Iterable, AsyncIterator]) -> AsyncIterator:
+        func = self._func
+
+        async def check(item: Any) -> Any:
+            return item, await _call(func, item)
+
+        async for item, keep in _amap(check, _iter, self._concurrency, self._ordered):
+            if keep:
+                yield item
+
+
+class AReduce(AbstractAsyncStage):
+    '''
+    Usage:
+    >>> total = await (urls | AMap(fetch, concurrency=100) | AMap(len) | AReduce(lambda x, y: x + y, 0))
+    '''
+
+    def __init__(self, func: Callable, initializer: Any = _MISSING):
+        self._func = func
+        self._storage = None
+        self._initializer = initializer
+
+    def _exec(self, _iter: Union[Iterable, AsyncIterator]) -> Awaitable:
+        return self._reduce(_iter)
+
+    async def _reduce(self, _iter: Union[Iterable, AsyncIterator]) -> Any:
+        it = _aiter(_iter)
+        value = self._initializer
+        if value is _MISSING:
+            try:
+                value = await it.__anext__()
+            except StopAsyncIteration:
+                raise TypeError("reduce() of empty iterable with no initial value") from None
+        async for item in it:
+            value = await _call(self._func, value, item)
+        return value
+
+    def __ror__(self, _iter: Union[Iterable, AsyncIterator]) -> Awaitable:
+        return self._exec(_iter)
@@ -1,11 +1,27 @@
 from typing import Callable
 
+# marks arguments that were not passed, when None is a meaningful value
+_MISSING = object()
+
 class PipeManagerEnd:
     
     def __ror__(self , other):
         return other
 
-class AbstractSelfModifiedClass:
+class _RightOperand:
+    '''
+    Base of the objects used on the right of `|`: numpy arrays then defer 
+    `numpy_array | obj` to obj.__ror__ instead of broadcasting the operator.
+    '''
+
+    __slots__ = ()
+    __array_ufunc__ = None
+
+class AbstractSelfModifiedClass(_RightOperand):
+
+    # set on the copy returned by `source | Stage`, the stage itself stays unbound 
+    # so `Stage | Stage` keeps building plans however often it was used
+    _bound = False
     
     def __init__(self , func):
         self._func = func
@@ -15,13 +31,17 @@ class AbstractSelfModifiedClass:
         return self
 
     def __call__(self , _iter):
-        return self
+        return self._bind(self._exec(_iter))
 
     def __iter__(self):
         return self._storage
 
     def __or__(self , other):
-        if self._storage is None:
+        if not self._bound:
+            if isinstance(other , AbstractSelfModifiedClass) or (isinstance(other , Callable) and not isinstance(other , tuple)):
+                # chaining without a source builds a reusable plan
+                from .plan import Plan
+                return Plan((self , other))
             raise RuntimeError("Empty object is not allowed to be used in chain.")
         if isinstance(other , PipeManagerEnd):
             return self._storage
@@ -36,5 +56,12 @@ class AbstractSelfModifiedClass:
         return self
 
     def __ror__(self , _iter):
-        self._storage = self._exec(_iter)
-        return self
\ No newline at end of file
+        return self._bind(self._exec(_iter))
+
+    def _bind(self , storage):
+        # a fresh carrier for each pipe expression, sharing the stage's settings
+        carrier = object.__new__(type(self))
+        carrier.__dict__.update(self.__dict__)
+        carrier._bound = True
+        carrier._storage = storage
+        return carrier
\ No newline at end of file
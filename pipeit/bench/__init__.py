@@ -0,0 +1,93 @@
+import re
+import json
+import platform
+from typing import Callable, Dict, List, Optional, Any
+from ..timer import timeit
+
+_registry: Dict[str, Dict[str, Any]] = {}
+
+
+def benchmark(name: Optional[str] = None, loops: int = 1000, group: str = 'misc') -> Callable:
+    '''
+    Register a benchmark case, the decorated function is called `loops` times per repeat.
+    Usage:
+    >>> @benchmark(loops=10000, group='wrapper')
+    >>> def map_filter():
+    >>>     range(100) | Filter(lambda x: x % 3) | Map(str) | list
+    '''
+    def decorator(func: Callable) -> Callable:
+        case_name = name or func.__name__
+        if case_name in _registry:
+            raise ValueError(f"Benchmark {case_name!r} is already registered")
+        _registry[case_name] = {'func': func, 'loops': int(loops), 'group': group}
+        return func
+    return decorator
+
+
+def registered(pattern: Optional[str] = None) -> List[str]:
+    '''Names of registered cases, `pattern` is searched in "group.name".'''
+    return [name for name, case in _registry.items() if pattern is None or re.search(pattern, f"{case['group']}.{name}")]
+
+
+def run(pattern: Optional[str] = None, repeat: int = 5, warmup: int = 1, scale: float = 1.0, verbose: bool = True) -> Dict[str, Any]:
+    '''
+    Run registered cases whose name matches `pattern`, returns a JSON-serializable report.
+    `scale` multiplies the loop numbers of every case, e.g. 0.1 for a quick smoke run.
+    '''
+    results = {}
+    for name in registered(pattern):
+        case = _registry[name]
+        func = case['func']
+        t = timeit(max(1, int(case['loops'] * scale)), name=name, repeat=repeat, warmup=warmup, disable_gc=True, verbose=False)
+        for _ in t:
+            func()
+        results[name] = dict(t.result.to_dict(), group=case['group'])
+        if verbose:
+            print(f"{name:<32}{t.result.median * 1e6:>12.3f}μs / loop  (p95 {t.result.p95 * 1e6:.3f}μs)")
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+
+
+def save(report: Dict[str, Any], file_name: str) -> None:
+    with open(file_name, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+
+def load(file_name: str) -> Dict[str, Any]:
+    with open(file_name, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], threshold: float = 0.1) -> List[Dict[str, Any]]:
+    '''
+    Compare medians of `report` with `baseline`, cases slower by more than 
+    `threshold` (relative) are flagged as regressions.
+    '''
+    rows = []
+    for name, result in report['results'].items():
+        base = baseline.get('results', {}).get(name)
+        if base is None:
+            continue
+        ratio = result['median'] / base['median'] if base['median'] > 0 else float('inf')
+        rows.append({
+            'name': name,
+            'baseline': base['median'],
+            'current': result['median'],
+            'ratio': ratio,
+            'regression': ratio > 1 + threshold,
+        })
+    return rows
+
+
+def print_comparison(rows: List[Dict[str, Any]], file: Any = None) -> None:
+    for row in rows:
+        flag = 'REGRESSION' if row['regression'] else ''
+        print(
+            f"{row['name']:<32}{row['baseline'] * 1e6:>12.3f}μs -> {row['current'] * 1e6:>12.3f}μs"
+            f"{row['ratio']:>8.2f}x {flag}", 
+            file=file
+        )
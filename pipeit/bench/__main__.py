@@ -0,0 +1,31 @@
+import sys
+import argparse
+from . import run, save, load, compare, print_comparison
+from . import cases  # noqa: F401, registers the built-in cases
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m pipeit.bench', description='Run pipeit benchmarks.')
+    parser.add_argument('-k', '--filter', default=None, help='only run cases whose "group.name" matches this regular expression')
+    parser.add_argument('-r', '--repeat', type=int, default=5, help='repeats per case')
+    parser.add_argument('-w', '--warmup', type=int, default=1, help='warmup rounds per case')
+    parser.add_argument('-s', '--scale', type=float, default=1.0, help='multiply the loop number of every case')
+    parser.add_argument('-o', '--output', default=None, help='save results to this JSON file')
+    parser.add_argument('-b', '--baseline', default=None, help='compare with results saved before')
+    parser.add_argument('-t', '--threshold', type=float, default=0.1, help='relative slowdown counted as regression')
+    args = parser.parse_args(argv)
+
+    report = run(args.filter, repeat=args.repeat, warmup=args.warmup, scale=args.scale)
+    if args.output:
+        save(report, args.output)
+    if args.baseline:
+        rows = compare(report, load(args.baseline), args.threshold)
+        print()
+        print_comparison(rows)
+        if any(row['regression'] for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
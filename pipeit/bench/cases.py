@@ -0,0 +1,116 @@
+import os
+import atexit
+import shutil
+import tempfile
+from functools import reduce
+from . import benchmark
+from .. import PIPE, END, Map, Filter, Reduce, Fused, Read, Write, ReadB, WriteB
+
+_data = list(range(100))
+_big = list(range(10000))
+_is_odd = lambda x: x % 3
+_times_ten = lambda x: 10 * x
+_add = lambda x, y: x + y
+_positive = lambda x: x > 0
+
+_tmp_dir = tempfile.mkdtemp(prefix='pipeit-bench-')
+atexit.register(shutil.rmtree, _tmp_dir, True)
+_text_file = os.path.join(_tmp_dir, 'bench.txt')
+_text = 'pipeit ' * 1000
+with open(_text_file, 'w', encoding='utf-8') as f:
+    f.write(_text)
+
+
+# wrapper: the README example, against plain functional python
+
+@benchmark(loops=20000, group='wrapper')
+def builtin_filter_map_reduce():
+    reduce(_add, map(_times_ten, filter(_is_odd, _data)))
+
+
+@benchmark(loops=20000, group='wrapper')
+def filter_map_reduce():
+    _data | Filter(_is_odd) | Map(_times_ten) | Reduce(_add) | END
+
+
+@benchmark(loops=20000, group='wrapper')
+def tuple_filter_map_reduce():
+    PIPE | _data | (filter, _is_odd) | (map, _times_ten) | Reduce(_add) | END
+
+
+@benchmark(loops=20000, group='wrapper')
+def plan_filter_map_reduce(plan=Filter(_is_odd) | Map(_times_ten) | Reduce(_add)):
+    _data | plan
+
+
+# fusion: long Map / Filter runs against a comprehension
+
+@benchmark(loops=200, group='fused')
+def comprehension_chain():
+    [y for x in _big if _is_odd(x) for y in (_times_ten(x), ) if _positive(y)]
+
+
+@benchmark(loops=200, group='fused')
+def map_filter_chain():
+    _big | Filter(_is_odd) | Map(_times_ten) | Filter(_positive) | list
+
+
+@benchmark(loops=200, group='fused')
+def fused_chain(stage=Fused(Filter(_is_odd), Map(_times_ten), Filter(_positive))):
+    _big | stage | list
+
+
+# PIPE
+
+@benchmark(loops=50000, group='pipe')
+def pipe_short():
+    PIPE | _data | (map, str) | END
+
+
+@benchmark(loops=20000, group='pipe')
+def pipe_long():
+    PIPE | _data | Filter(_is_odd) | Map(_times_ten) | (map, str) | list | len | END
+
+
+# io: call overhead of Read / Write against a bare open
+
+@benchmark(loops=2000, group='io')
+def builtin_open_read():
+    with open(_text_file, 'r', encoding='utf-8') as f:
+        f.read()
+
+
+@benchmark(loops=2000, group='io')
+def read():
+    Read(_text_file)
+
+
+@benchmark(loops=2000, group='io')
+def read_pipe():
+    Read(_text_file) | len
+
+
+@benchmark(loops=2000, group='io')
+def readb():
+    ReadB(_text_file)
+
+
+@benchmark(loops=2000, group='io')
+def builtin_open_write():
+    with open(_text_file, 'w', encoding='utf-8') as f:
+        f.write(_text)
+
+
+@benchmark(loops=2000, group='io')
+def write():
+    Write(_text_file, _text)
+
+
+@benchmark(loops=2000, group='io')
+def write_pipe():
+    _text | Write(_text_file)
+
+
+@benchmark(loops=2000, group='io')
+def writeb_pipe(data=_text.encode('utf-8')):
+    data | WriteB(_text_file)
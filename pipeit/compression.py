@@ -0,0 +1,186 @@
+import io
+import os
+import queue
+import threading
+from importlib import import_module
+from typing import Union, Optional, IO, Any
+from .base import _MISSING
+
+# codec name -> stdlib module providing a compatible `open`
+_CODECS = {'gzip': 'gzip', 'bz2': 'bz2', 'xz': 'lzma'}
+_EXTENSIONS = {'.gz': 'gzip', '.gzip': 'gzip', '.bz2': 'bz2', '.xz': 'xz', '.lzma': 'xz'}
+_MAGIC = ((b'\x1f\x8b', 'gzip'), (b'BZh', 'bz2'), (b'\xfd7zXZ\x00', 'xz'))
+_MAGIC_SIZE = 6
+_CHUNK_SIZE = 1 << 16
+_QUEUE_DEPTH = 8
+
+
+def _infer_compression(file_name: Any) -> Optional[str]:
+    if not isinstance(file_name, (str, bytes, os.PathLike)):
+        return None
+    ext = os.path.splitext(os.fsdecode(file_name))[1].lower()
+    return _EXTENSIONS.get(ext)
+
+
+def _sniff_compression(head: bytes) -> Optional[str]:
+    for magic, codec in _MAGIC:
+        if head.startswith(magic):
+            return codec
+    return None
+
+
+class _ThreadedReader(io.RawIOBase):
+    '''
+    Read a decompressing stream on a background thread, handing the chunks
+    over through a bounded queue, so codec work overlaps with the consumer.
+    '''
+
+    def __init__(self, stream: IO[bytes]):
+        super().__init__()
+        self._stream = stream
+        self._queue = queue.Queue(_QUEUE_DEPTH)
+        self._stop = threading.Event()
+        self._chunk = memoryview(b'')
+        self._eof = False
+        self._thread = threading.Thread(target=self._produce, daemon=True)
+        self._thread.start()
+
+    def _put(self, item: Any) -> None:
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def _produce(self) -> None:
+        try:
+            while not self._stop.is_set():
+                chunk = self._stream.read(_CHUNK_SIZE)
+                self._put(chunk)
+                if not chunk:
+                    return
+        except BaseException as exc:
+            self._put(exc)
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if not self._chunk:
+            if self._eof:
+                return 0
+            item = self._queue.get()
+            if isinstance(item, BaseException):
+                self._eof = True
+                raise item
+            if not item:
+                self._eof = True
+                return 0
+            self._chunk = memoryview(item)
+        size = min(len(buffer), len(self._chunk))
+        buffer[:size] = self._chunk[:size]
+        self._chunk = self._chunk[size:]
+        return size
+
+    def close(self) -> None:
+        if not self.closed:
+            self._stop.set()
+            self._thread.join()
+            self._stream.close()
+        super().close()
+
+
+class _ThreadedWriter(io.RawIOBase):
+    '''
+    Hand written chunks over to a background thread compressing them into
+    the stream, through a bounded queue. Errors of the codec are raised by
+    the next write or by close.
+    '''
+
+    def __init__(self, stream: IO[bytes]):
+        super().__init__()
+        self._stream = stream
+        self._queue = queue.Queue(_QUEUE_DEPTH)
+        self._error = None
+        self._thread = threading.Thread(target=self._consume, daemon=True)
+        self._thread.start()
+
+    def _consume(self) -> None:
+        while True:
+            chunk = self._queue.get()
+            if chunk is None:
+                return
+            if self._error is None:
+                try:
+                    self._stream.write(chunk)
+                except BaseException as exc:
+                    # keep draining so the writer never blocks on a full queue
+                    self._error = exc
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        if self._error is not None:
+            raise self._error
+        chunk = bytes(data)
+        self._queue.put(chunk)
+        return len(chunk)
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        try:
+            self._stream.close()
+        finally:
+            super().close()
+        if self._error is not None:
+            raise self._error
+
+
+def _open(
+    file_name: Any,
+    mode: str,
+    encoding: Union[None, str] = None,
+    buffering: int = -1,
+    compression: Union[None, str] = _MISSING,
+    threaded: bool = False
+) -> IO:
+    '''
+    `open()` with transparent gzip / bz2 / xz (de)compression. 'infer' picks the 
+    codec from the file extension, 'auto' also checks the magic bytes of files 
+    being read. By default text files are inferred and binary files left raw. 
+    `threaded` runs the codec on a background thread.
+    '''
+    if compression is _MISSING:
+        compression = None if 'b' in mode else 'infer'
+    sniff = compression == 'auto' and 'r' in mode
+    if compression in ('infer', 'auto'):
+        compression = _infer_compression(file_name)
+        sniff = sniff and compression is None
+    elif compression is not None and compression not in _CODECS:
+        raise ValueError(f"Unknown compression {compression!r}, expected one of 'infer', 'auto', None, 'gzip', 'bz2', 'xz'")
+    binary = 'b' in mode
+    raw_mode = mode.replace('t', '').replace('b', '') + 'b'
+    if compression is None and not sniff:
+        return open(file_name, mode, buffering=buffering, encoding=encoding)
+    if sniff:
+        f = open(file_name, raw_mode, buffering=-1 if buffering in (0, 1) else buffering)
+        compression = _sniff_compression(f.peek(_MAGIC_SIZE)[:_MAGIC_SIZE])
+        if compression is None:
+            return f if binary else io.TextIOWrapper(f, encoding=encoding, line_buffering=buffering == 1)
+        f.close()
+    if buffering != -1:
+        raise ValueError("buffering is not supported for compressed files")
+    codec = import_module(_CODECS[compression])
+    if not threaded:
+        return codec.open(file_name, mode if binary else raw_mode[:-1] + 't', encoding=encoding)
+    stream = codec.open(file_name, raw_mode)
+    if 'r' in mode:
+        f = io.BufferedReader(_ThreadedReader(stream), _CHUNK_SIZE)
+    else:
+        f = io.BufferedWriter(_ThreadedWriter(stream), _CHUNK_SIZE)
+    return f if binary else io.TextIOWrapper(f, encoding=encoding)
@@ -0,0 +1,100 @@
+import math
+from collections import OrderedDict
+from typing import Callable, Iterable, Iterator, Optional, Any
+from .base import AbstractSelfModifiedClass
+
+_MASK64 = (1 << 64) - 1
+
+
+class _BloomFilter:
+    '''
+    Bit-array Bloom filter sized for `capacity` items at `error_rate`.
+    Bit positions come from double hashing a splitmix64 scramble of `hash(item)`.
+    '''
+
+    __slots__ = ('_bits', '_size', '_hashes')
+
+    def __init__(self, capacity: int, error_rate: float):
+        size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self._size = size
+        self._hashes = max(1, round(size / capacity * math.log(2)))
+        self._bits = bytearray((size + 7) // 8)
+
+    def add(self, item: Any) -> bool:
+        '''Add `item`, return whether it was (probably) present already.'''
+        z = (hash(item) + 0x9E3779B97F4A7C15) & _MASK64
+        z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+        z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK64
+        z ^= z >> 31
+        h1, h2 = z & 0xFFFFFFFF, (z >> 32) | 1
+        bits, size = self._bits, self._size
+        present = True
+        for i in range(self._hashes):
+            pos = (h1 + i * h2) % size
+            byte, mask = pos >> 3, 1 << (pos & 7)
+            if not bits[byte] & mask:
+                present = False
+                bits[byte] |= mask
+        return present
+
+
+class Distinct(AbstractSelfModifiedClass):
+    '''
+    Drop repeated items, comparing `key(item)` if given.
+    Usage:
+    >>> [1, 2, 1, 3, 2] | Distinct() | list
+    [1, 2, 3]
+    >>> events | Distinct(key=lambda e: e.id, mode='bloom', capacity=10 ** 7, error_rate=0.001)
+    >>> events | Distinct(key=lambda e: e.id, mode='lru', capacity=10000)
+    Modes:
+    - 'exact': remembers every key in a set, memory grows with the number of distinct keys.
+    - 'bloom': fixed-size Bloom filter for about `capacity` keys, a new item is 
+      wrongly dropped with probability `error_rate` (more once over capacity).
+    - 'lru': only dedups within the `capacity` most recently seen keys.
+    '''
+
+    def __init__(self, key: Optional[Callable] = None, mode: str = 'exact', capacity: Optional[int] = None, error_rate: float = 0.01):
+        if mode not in ('exact', 'bloom', 'lru'):
+            raise ValueError("Parameter mode must be 'exact', 'bloom' or 'lru'")
+        if capacity is not None and capacity < 1:
+            raise ValueError("Parameter capacity must >= 1")
+        if not 0 < error_rate < 1:
+            raise ValueError("Parameter error_rate must be between 0 and 1")
+        self._func = key
+        self._storage = None
+        self._mode = mode
+        self._capacity = capacity or 1000000
+        self._error_rate = error_rate
+
+    def _exec(self, _iter: Iterable) -> Iterator:
+        return getattr(self, f'_{self._mode}')(_iter)
+
+    def _exact(self, _iter: Iterable) -> Iterator:
+        key = self._func
+        seen = set()
+        add = seen.add
+        for item in _iter:
+            k = item if key is None else key(item)
+            if k not in seen:
+                add(k)
+                yield item
+
+    def _bloom(self, _iter: Iterable) -> Iterator:
+        key = self._func
+        add = _BloomFilter(self._capacity, self._error_rate).add
+        for item in _iter:
+            if not add(item if key is None else key(item)):
+                yield item
+
+    def _lru(self, _iter: Iterable) -> Iterator:
+        key, capacity = self._func, self._capacity
+        recent = OrderedDict()
+        for item in _iter:
+            k = item if key is None else key(item)
+            if k in recent:
+                recent.move_to_end(k)
+                continue
+            recent[k] = None
+            if len(recent) > capacity:
+                recent.popitem(last=False)
+            yield item
@@ -0,0 +1,338 @@
+import os
+import heapq
+import shutil
+import pickle
+import tempfile
+from itertools import islice
+from typing import Callable, Iterable, Iterator, Optional, Any
+from .base import AbstractSelfModifiedClass, _MISSING
+from .io import ReadB, WriteB
+
+
+class _SpillDir:
+    '''
+    Temporary directory holding pickled data that doesn't fit in memory.
+    '''
+
+    def __init__(self):
+        self.path = tempfile.mkdtemp(prefix='pipeit-')
+        self._files = 0
+
+    def dump(self, obj: Any) -> str:
+        file_name = os.path.join(self.path, f'{self._files}.pkl')
+        self._files += 1
+        WriteB(file_name, pickle.dumps(obj, pickle.HIGHEST_PROTOCOL))
+        return file_name
+
+    def load(self, file_name: str) -> Any:
+        return pickle.loads(ReadB(file_name))
+
+    def dump_stream(self, items: Iterable, batch: int = 1024) -> str:
+        # pickled in batches, so the file can be read back lazily
+        file_name = os.path.join(self.path, f'{self._files}.pkl')
+        self._files += 1
+        it = iter(items)
+        with open(file_name, 'wb') as f:
+            for chunk in iter(lambda: list(islice(it, batch)), []):
+                pickle.dump(chunk, f, pickle.HIGHEST_PROTOCOL)
+        return file_name
+
+    def load_stream(self, file_name: str) -> Iterator:
+        with open(file_name, 'rb') as f:
+            while True:
+                try:
+                    chunk = pickle.load(f)
+                except EOFError:
+                    return
+                yield from chunk
+
+    def close(self) -> None:
+        shutil.rmtree(self.path, ignore_errors=True)
+
+
+class GroupBy(AbstractSelfModifiedClass):
+    '''
+    Hash aggregation by `key`, yields (key, result) pairs.
+    Usage:
+    >>> range(10) | GroupBy(lambda x: x % 3) | dict
+    {0: [0, 3, 6, 9], 1: [1, 4, 7], 2: [2, 5, 8]}
+    # reduce every group with `agg`, starting from `factory()` or the first item
+    >>> orders | GroupBy(lambda o: o.user, agg=lambda n, o: n + o.amount, factory=int, combine=operator.add) | dict
+    When more than `memory_limit` entries (items when collecting lists, groups 
+    when aggregating) are held in memory, partial groups are spilled to temporary 
+    files in `partitions` hash partitions and merged with `combine` at the end, 
+    partition by partition. Spilling aggregates requires `combine`. Output order 
+    is the order of first appearance unless something was spilled.
+    '''
+
+    def __init__(
+        self, 
+        key: Callable, 
+        agg: Optional[Callable] = None, 
+        factory: Optional[Callable] = None, 
+        combine: Optional[Callable] = None, 
+        memory_limit: int = 1000000, 
+        partitions: int = 16
+    ):
+        if memory_limit < 1 or partitions < 1:
+            raise ValueError("Parameter memory_limit and partitions must >= 1")
+        self._func = key
+        self._storage = None
+        self._agg = agg
+        self._factory = factory
+        self._combine = combine
+        self._memory_limit = memory_limit
+        self._partitions = partitions
+
+    def _exec(self, _iter: Iterable) -> Iterator:
+        return self._group(_iter)
+
+    def _group(self, _iter: Iterable) -> Iterator:
+        key, agg, factory = self._func, self._agg, self._factory
+        groups = {}
+        held = 0
+        spill = None
+        spilled = [[] for _ in range(self._partitions)]
+        try:
+            for item in _iter:
+                k = key(item)
+                if agg is None:
+                    group = groups.get(k)
+                    if group is None:
+                        groups[k] = [item]
+                    else:
+                        group.append(item)
+                    held += 1
+                else:
+                    acc = groups.get(k, _MISSING)
+                    if acc is _MISSING:
+                        groups[k] = item if factory is None else agg(factory(), item)
+                        held += 1
+                    else:
+                        groups[k] = agg(acc, item)
+                if held >= self._memory_limit:
+                    spill = spill or _SpillDir()
+                    self._spill(groups, spill, spilled)
+                    groups, held = {}, 0
+            if spill is None:
+                yield from groups.items()
+                return
+            self._spill(groups, spill, spilled)
+            groups = None
+            combine = self._combine or (lambda a, b: a + b)
+            for file_names in spilled:
+                merged = {}
+                for file_name in file_names:
+                    for k, acc in spill.load(file_name).items():
+                        prev = merged.get(k, _MISSING)
+                        merged[k] = acc if prev is _MISSING else combine(prev, acc)
+                yield from merged.items()
+        finally:
+            if spill is not None:
+                spill.close()
+
+    def _spill(self, groups: dict, spill: _SpillDir, spilled: list) -> None:
+        if self._agg is not None and self._combine is None:
+            raise ValueError("GroupBy exceeded memory_limit, pass `combine` to allow spilling partial aggregates.")
+        partitions = [{} for _ in range(self._partitions)]
+        for k, acc in groups.items():
+            partitions[hash(k) % self._partitions][k] = acc
+        for file_names, partition in zip(spilled, partitions):
+            if partition:
+                file_names.append(spill.dump(partition))
+
+
+class Sort(AbstractSelfModifiedClass):
+    '''
+    Usage:
+    >>> [3, 1, 2] | Sort() | list
+    [1, 2, 3]
+    >>> for record in huge_log | Sort(key=lambda r: r.ts, memory_limit=10 ** 6):
+    >>>     ...
+    Inputs of up to `memory_limit` items are sorted in memory, larger ones are 
+    split into sorted runs written to temporary files, which are then k-way 
+    merged lazily with a heap. The sort is stable, like `sorted`.
+    '''
+
+    def __init__(self, key: Optional[Callable] = None, reverse: bool = False, memory_limit: int = 1000000):
+        if memory_limit < 1:
+            raise ValueError("Parameter memory_limit must >= 1")
+        self._func = key
+        self._storage = None
+        self._reverse = reverse
+        self._memory_limit = memory_limit
+
+    def _exec(self, _iter: Iterable) -> Iterator:
+        return self._sort(_iter)
+
+    def _sort(self, _iter: Iterable) -> Iterator:
+        key, reverse, limit = self._func, self._reverse, self._memory_limit
+        it = iter(_iter)
+        run = list(islice(it, limit))
+        if len(run) < limit:
+            run.sort(key=key, reverse=reverse)
+            yield from run
+            return
+        spill = _SpillDir()
+        try:
+            runs = []
+            while run:
+                run.sort(key=key, reverse=reverse)
+                runs.append(spill.dump_stream(run))
+                run = list(islice(it, limit))
+            yield from heapq.merge(*(spill.load_stream(file_name) for file_name in runs), key=key, reverse=reverse)
+        finally:
+            spill.close()
+
+
+class TopK(AbstractSelfModifiedClass):
+    '''
+    The `k` largest (or smallest) items, sorted, with memory bounded by `k`.
+    Usage:
+    >>> [5, 1, 4, 2, 3] | TopK(2)
+    [5, 4]
+    >>> scores | TopK(10, key=lambda s: s.value, largest=False)
+    '''
+
+    def __init__(self, k: int, key: Optional[Callable] = None, largest: bool = True):
+        if k < 0:
+            raise ValueError("Parameter k must >= 0")
+        self._func = key
+        self._storage = None
+        self._k = k
+        self._largest = largest
+
+    def _exec(self, _iter: Iterable) -> list:
+        select = heapq.nlargest if self._largest else heapq.nsmallest
+        return select(self._k, _iter, key=self._func)
+
+    def __ror__(self, _iter: Iterable) -> list:
+        return self._exec(_iter)
+
+
+def _partition_to_disk(spill: _SpillDir, _iter: Iterable, key: Callable, partitions: int, memory_limit: int) -> list:
+    # hash partition `_iter` into files, flushing every buffer when `memory_limit` items are held
+    buffers = [[] for _ in range(partitions)]
+    file_names = [[] for _ in range(partitions)]
+    held = 0
+
+    def flush():
+        for buffer, names in zip(buffers, file_names):
+            if buffer:
+                names.append(spill.dump_stream(buffer))
+                buffer.clear()
+
+    for item in _iter:
+        buffers[hash(key(item)) % partitions].append(item)
+        held += 1
+        if held >= memory_limit:
+            flush()
+            held = 0
+    flush()
+    return file_names
+
+
+class Join(AbstractSelfModifiedClass):
+    '''
+    Hash join the piped stream with `other`, yields (left, right) pairs.
+    Usage:
+    >>> users = [(1, 'ann'), (2, 'bob')]
+    >>> [(1, 'book'), (3, 'pen')] | Join(users, left_key=lambda o: o[0], right_key=lambda u: u[0], how='left') | list
+    [((1, 'book'), (1, 'ann')), ((3, 'pen'), None)]
+    A hash table is built on `other` and the stream is probed through it lazily.
+    For inner joins between two sized inputs the table is built on the smaller 
+    side, the output then follows the order of `other`.
+    With `partitions`, both sides are hash partitioned into temporary files first 
+    and joined partition by partition, for build sides that don't fit in memory.
+    A one-shot iterator passed as `other`, such as another pipeline, is read into 
+    a list up front so the join can be applied any number of times. With 
+    `partitions` it is streamed to disk instead, and can be joined only once: 
+    applying the join a second time raises RuntimeError.
+    '''
+
+    def __init__(
+        self, 
+        other: Iterable, 
+        left_key: Callable, 
+        right_key: Optional[Callable] = None, 
+        how: str = 'inner', 
+        partitions: Optional[int] = None, 
+        memory_limit: int = 1000000
+    ):
+        if how not in ('inner', 'left'):
+            raise ValueError("Parameter how must be 'inner' or 'left'")
+        if partitions is not None and partitions < 1:
+            raise ValueError("Parameter partitions must >= 1")
+        self._func = left_key
+        self._storage = None
+        # iterators and piped stages can only be read once, they are materialized 
+        # unless they may not fit in memory
+        one_shot = isinstance(other, (Iterator, AbstractSelfModifiedClass))
+        self._one_shot = one_shot and partitions is not None
+        self._other = list(other) if one_shot and partitions is None else other
+        self._other_used = False
+        self._right_key = right_key or left_key
+        self._how = how
+        self._partitions = partitions
+        self._memory_limit = memory_limit
+
+    def _exec(self, _iter: Iterable) -> Iterator:
+        if self._partitions is not None:
+            return self._partitioned_join(_iter)
+        if self._how == 'inner' and _smaller(_iter, self._other):
+            return self._join_build_left(_iter)
+        return self._join(_iter)
+
+    def _build(self, _iter: Iterable, key: Callable) -> dict:
+        table = {}
+        for item in _iter:
+            k = key(item)
+            rows = table.get(k)
+            if rows is None:
+                table[k] = [item]
+            else:
+                rows.append(item)
+        return table
+
+    def _probe(self, _iter: Iterable, table: dict) -> Iterator:
+        key, outer = self._func, self._how == 'left'
+        for item in _iter:
+            rows = table.get(key(item))
+            if rows is not None:
+                for row in rows:
+                    yield item, row
+            elif outer:
+                yield item, None
+
+    def _join(self, _iter: Iterable) -> Iterator:
+        yield from self._probe(_iter, self._build(self._other, self._right_key))
+
+    def _join_build_left(self, _iter: Iterable) -> Iterator:
+        table, key = self._build(_iter, self._func), self._right_key
+        for item in self._other:
+            rows = table.get(key(item))
+            if rows is not None:
+                for row in rows:
+                    yield row, item
+
+    def _partitioned_join(self, _iter: Iterable) -> Iterator:
+        if self._one_shot:
+            if self._other_used:
+                raise RuntimeError("The iterator joined with `partitions` is already consumed, pass a re-iterable collection to join it again.")
+            self._other_used = True
+        spill = _SpillDir()
+        try:
+            right = _partition_to_disk(spill, self._other, self._right_key, self._partitions, self._memory_limit)
+            left = _partition_to_disk(spill, _iter, self._func, self._partitions, self._memory_limit)
+            for left_files, right_files in zip(left, right):
+                table = self._build((row for file_name in right_files for row in spill.load_stream(file_name)), self._right_key)
+                yield from self._probe((item for file_name in left_files for item in spill.load_stream(file_name)), table)
+        finally:
+            spill.close()
+
+
+def _smaller(left: Iterable, right: Iterable) -> bool:
+    try:
+        return len(left) < len(right)
+    except TypeError:
+        return False
@@ -1,4 +1,4 @@
-from .io_base import BaseRead, BaseWrite
+from .io_base import BaseRead, BaseWrite, BaseReadLines, BaseReadChunks
 
 class Read(BaseRead):
 
@@ -24,3 +24,34 @@ class WriteB(BaseWrite):
     def _write_type(cls) -> str:
         return 'wb' 
 
+class ReadLines(BaseReadLines):
+    '''
+    Usage:
+    >>> ReadLines("app.log") | Filter(lambda line: 'ERROR' in line) | Map(str.strip) | list
+    '''
+
+    @classmethod
+    def _read_type(cls) -> str:
+        return 'r'
+
+class ReadLinesB(BaseReadLines):
+
+    @classmethod
+    def _read_type(cls) -> str:
+        return 'rb'
+
+class ReadChunks(BaseReadChunks):
+    '''
+    Usage:
+    >>> ReadChunks("data.txt", size = 1 << 20) | Map(len) | sum
+    '''
+
+    @classmethod
+    def _read_type(cls) -> str:
+        return 'r'
+
+class ReadChunksB(BaseReadChunks):
+
+    @classmethod
+    def _read_type(cls) -> str:
+        return 'rb'
@@ -1,6 +1,23 @@
-from types import ClassMethodDescriptorType
-from typing import Callable, Union, Type, Any
-from .base import AbstractSelfModifiedClass, PipeManagerEnd
+import io
+import sys
+import mmap as _mmap
+from dis import get_instructions
+from types import ClassMethodDescriptorType, CodeType, FrameType
+from typing import Callable, Union, Type, Dict, Tuple, Iterable, Any
+from .base import AbstractSelfModifiedClass, PipeManagerEnd, _RightOperand, _MISSING
+from .compression import _open
+
+# Binary operators that make `Read()` / `Write()` return a pipe object, as 
+# opcodes before python 3.11 and as BINARY_OP arguments since
+_PIPE_OPNAMES = frozenset((
+    'BINARY_OR', 'BINARY_RSHIFT', 'BINARY_LSHIFT', 
+    'INPLACE_OR', 'INPLACE_RSHIFT', 'INPLACE_LSHIFT',
+))
+_PIPE_OPERATORS = frozenset(('|', '>>', '<<', '|=', '>>=', '<<='))
+
+# (code object, instruction offset) of a call site -> whether it is used in a pipe
+_call_sites: Dict[Tuple[CodeType, int], bool] = {}
+_CALL_SITES_LIMIT = 4096
 
 class AbstractIO(object):
 
@@ -36,34 +53,71 @@ class AbstractIO(object):
         raise TypeError("RLSHIFT operation not allowed")
 
     @classmethod
-    def _ast_bitor_detect(cls, code: str) -> bool:
-        from ast import parse, walk, unparse, Expr, Str, BitOr, RShift, LShift
-        tree = parse(code)
-        for node in walk(tree):
-            if isinstance(node, BitOr) or isinstance(node, RShift) or isinstance(node, LShift):
+    def _pipe_call_site(cls, frame: FrameType) -> bool:
+        '''
+        Whether the line of `frame` applies `|`, `>>` or `<<`, in which case 
+        the caller wants a pipe object instead of the file content. Decided 
+        from the bytecode, so no source code is needed, and cached per call site.
+        '''
+        key = (frame.f_code, frame.f_lasti)
+        detected = _call_sites.get(key)
+        if detected is None:
+            if len(_call_sites) >= _CALL_SITES_LIMIT:
+                _call_sites.clear()
+            detected = _call_sites[key] = cls._bytecode_bitor_detect(frame.f_code, frame.f_lineno)
+        return detected
+
+    @staticmethod
+    def _bytecode_bitor_detect(code: CodeType, lineno: int) -> bool:
+        line = None
+        for instr in get_instructions(code):
+            if sys.version_info >= (3, 11):
+                line = instr.positions.lineno
+            elif instr.starts_line is not None:
+                line = instr.starts_line
+            if line != lineno:
+                continue
+            if instr.opname in _PIPE_OPNAMES or (instr.opname == 'BINARY_OP' and instr.argrepr in _PIPE_OPERATORS):
                 return True
-        return False 
-
-        # # The following code is used to remove comments from 'code'
-        #     if isinstance(node, Expr) and isinstance(node.value, Str):
-        #         node.value.s = ""
-        # filtered_code = unparse(tree)
-        # return filtered_code
+        return False
 
 
 class ReadPseudo:
     """Used as input type check"""
-    def __init__(self, file_name: str, encoding: Union[None, str] = None):
+    def __init__(
+        self, 
+        file_name: str, 
+        encoding: Union[None, str] = None, 
+        mmap: bool = False, 
+        compression: Union[None, str] = _MISSING, 
+        threaded: bool = False
+    ):
         self._file_name = file_name
         self._encoding = encoding
+        self._mmap = mmap
+        self._compression = compression
+        self._threaded = threaded
 
 
 class WritePseudo:
     """Used as input type check"""
-    def __init__(self, file_name: str, text: Union[str, bytes], encoding: Union[None, str] = None):
+    def __init__(
+        self, 
+        file_name: str, 
+        text: Union[str, bytes, Iterable[Union[str, bytes]]], 
+        encoding: Union[None, str] = None, 
+        append: bool = False, 
+        buffering: int = -1, 
+        compression: Union[None, str] = _MISSING, 
+        threaded: bool = False
+    ):
         self._file_name = file_name
         self._text = text
         self._encoding = encoding
+        self._append = append
+        self._buffering = buffering
+        self._compression = compression
+        self._threaded = threaded
 
 
 class BaseRead(AbstractIO):
@@ -73,45 +127,54 @@ class BaseRead(AbstractIO):
         raise NotImplementedError()
 
     def __new__(cls, *args, **kwargs) -> Union[str, bytes, Type['BaseRead']]:
-        from inspect import currentframe, getframeinfo
-        
-        caller_frame = currentframe().f_back
-        caller_context = ''.join(getframeinfo(caller_frame).code_context)
-        if cls._ast_bitor_detect(caller_context.strip()):
+        if cls._pipe_call_site(sys._getframe(1)):
             return super().__new__(cls)
         else:
             try:
                 rp = ReadPseudo(*args, **kwargs)
             except Exception as e:
                 raise e
-            file_name = rp._file_name
-            encoding = None  
-            if 'b' not in cls._read_type():
-                if rp._encoding is None:
-                    encoding = 'utf-8'
-                else:
-                    encoding = rp._encoding
-            else:
-                if rp._encoding is not None:
-                    raise ValueError("binary mode doesn't take an encoding argument")
-            with open(file_name, cls._read_type(), encoding=encoding) as f:
-                return f.read()
-
-    def __init__(self, file_name: str, encoding: Union[None, str] = None):
+            return cls._read(rp._file_name, rp._encoding, rp._mmap, rp._compression, rp._threaded)
+
+    def __init__(
+        self, 
+        file_name: str, 
+        encoding: Union[None, str] = None, 
+        mmap: bool = False, 
+        compression: Union[None, str] = _MISSING, 
+        threaded: bool = False
+    ):
         self.file_name = file_name
         self.encoding = encoding
-        self._storage = None
-        encoding = None
-        if 'b' not in self.__class__._read_type():
-            if self.encoding is None:
+        self._storage = self.__class__._read(file_name, encoding, mmap, compression, threaded)
+
+    @classmethod
+    def _read(
+        cls, 
+        file_name: str, 
+        encoding: Union[None, str], 
+        mmap: bool, 
+        compression: Union[None, str], 
+        threaded: bool
+    ) -> Union[str, bytes, _mmap.mmap]:
+        if 'b' not in cls._read_type():
+            if mmap:
+                raise ValueError("mmap is only supported in binary mode")
+            if encoding is None:
                 encoding = 'utf-8'
-            else:
-                encoding = self.encoding
         else:
-            if self.encoding is not None:
+            if encoding is not None:
                 raise ValueError("binary mode doesn't take an encoding argument")
-        with open(file_name, self.__class__._read_type(), encoding=encoding) as f:
-            self._storage = f.read()
+        with _open(file_name, cls._read_type(), encoding, compression=compression, threaded=threaded) as f:
+            if not mmap:
+                return f.read()
+            if not isinstance(f, io.BufferedReader):
+                raise ValueError("mmap can't be used with compressed files")
+            # zero-copy read only mapping, it stays valid after the file is closed
+            # but empty files can't be mapped
+            if f.seek(0, 2) == 0:
+                return b''
+            return _mmap.mmap(f.fileno(), 0, access=_mmap.ACCESS_READ)
 
     def _opt(self, other:Any) -> Any:
         if isinstance(other, Callable):
@@ -130,61 +193,217 @@ class BaseRead(AbstractIO):
         return getattr(self._storage, attr)
 
 
-class BaseWrite(AbstractIO):
+class BaseWrite(AbstractIO, _RightOperand):
 
     @classmethod
     def _write_type(cls) -> str:
         raise NotImplementedError()
 
     def __new__(cls, *args, **kwargs) -> Union[int, Type['BaseWrite']]:
-        from inspect import currentframe, getframeinfo
-
-        caller_frame = currentframe().f_back
-        caller_context = ''.join(getframeinfo(caller_frame).code_context)
-        if cls._ast_bitor_detect(caller_context.strip()):
+        if cls._pipe_call_site(sys._getframe(1)):
             return super().__new__(cls)
         else:
             try:
                 wp = WritePseudo(*args, **kwargs)
             except Exception as e:
                 raise e
-            file_name, text = wp._file_name, wp._text
-            encoding = None 
-            if 'b' not in cls._write_type():
-                if wp._encoding is None:
-                    encoding = 'utf-8'
-                else:
-                    encoding = wp._encoding
-            else:
-                if wp._encoding is not None:
-                    raise ValueError("binary mode doesn't take an encoding argument")
-            with open(file_name, cls._write_type(), encoding=encoding) as f:
-                return f.write(text)
-
-    def __init__(self, file_name: str, text: Union[str, bytes, None] = None, encoding: Union[None, str] = None):
+            return cls._write(wp._file_name, wp._text, wp._encoding, wp._append, wp._buffering, wp._compression, wp._threaded)
+
+    def __init__(
+        self, 
+        file_name: str, 
+        text: Union[str, bytes, Iterable[Union[str, bytes]], None] = None, 
+        encoding: Union[None, str] = None, 
+        append: bool = False, 
+        buffering: int = -1, 
+        compression: Union[None, str] = _MISSING, 
+        threaded: bool = False
+    ):
         self.file_name = file_name
         self.encoding = encoding
+        self.append = append
+        self.buffering = buffering
+        self.compression = compression
+        self.threaded = threaded
         self._storage = None
         if text is not None:
             raise TypeError("Can't pass in text with pipe and specified text at the same time")
 
-    def _opt(self, other: Any) -> Union[int, Any]:
-        if isinstance(other, Union[str, bytes]):
-            encoding = None 
-            if 'b' not in self.__class__._write_type():
-                if self.encoding is None:
-                    encoding = 'utf-8'
-                else:
-                    encoding = self.encoding
-            else:
-                if self.encoding is not None:
-                    raise ValueError("binary mode doesn't take an encoding argument")
-            with open(self.file_name, self.__class__._write_type(), encoding=encoding) as f:
-                return f.write(other)
-        return other
+    @classmethod
+    def _write(
+        cls, 
+        file_name: str, 
+        data: Union[str, bytes, Iterable[Union[str, bytes]]], 
+        encoding: Union[None, str], 
+        append: bool, 
+        buffering: int, 
+        compression: Union[None, str] = _MISSING, 
+        threaded: bool = False
+    ) -> int:
+        '''
+        Write a str / bytes, or an iterable of them chunk by chunk, and return the 
+        number of characters (text mode) or bytes (binary mode) written.
+        '''
+        if 'b' not in cls._write_type():
+            if encoding is None:
+                encoding = 'utf-8'
+        else:
+            if encoding is not None:
+                raise ValueError("binary mode doesn't take an encoding argument")
+        mode = cls._write_type().replace('w', 'a') if append else cls._write_type()
+        single = isinstance(data, (str, bytes, bytearray, memoryview))
+        if not single and not isinstance(data, Iterable):
+            raise TypeError(f"Write requires str, bytes or an iterable of them, not '{type(data).__name__}'")
+        if not single:
+            # check the first chunk before the file is opened, and truncated
+            data = iter(data)
+            first = next(data, _MISSING)
+            if first is not _MISSING and not cls._valid_chunk(first):
+                raise TypeError(f"Write can't write chunks of type '{type(first).__name__}' in '{cls._write_type()}' mode")
+        with _open(file_name, mode, encoding, buffering, compression, threaded) as f:
+            if single:
+                return f.write(data)
+            count = 0
+            # any buffer can be written in binary mode, count its bytes, not its items
+            size = len if 'b' not in mode else lambda chunk: memoryview(chunk).nbytes
+
+            def counted():
+                nonlocal count
+                if first is _MISSING:
+                    return
+                count += size(first)
+                yield first
+                for chunk in data:
+                    count += size(chunk)
+                    yield chunk
+
+            # chunks are written as they come, the iterable is never joined in memory
+            f.writelines(counted())
+            return count
+
+    @classmethod
+    def _valid_chunk(cls, chunk: Any) -> bool:
+        if 'b' not in cls._write_type():
+            return isinstance(chunk, str)
+        try:
+            memoryview(chunk)
+        except TypeError:
+            return False
+        return True
+
+    def _opt(self, other: Any) -> int:
+        return self.__class__._write(
+            self.file_name, other, self.encoding, self.append, self.buffering, self.compression, self.threaded
+        )
+
+    # `stage | Write(...)` and `PIPE | ... | Write(...)` call the sink
+    __call__ = _opt
 
     def __ror__(self, other):
         return self._opt(other)
 
     def __rrshift__(self, other):
-        return self._opt(other)
\ No newline at end of file
+        return self._opt(other)
+
+
+class BaseReadStream(object):
+    '''
+    Lazy file source, the file is opened each time the object is iterated and 
+    read piece by piece, so pipelines run in constant memory. Not an 
+    `AbstractIO`: the object is always returned, whatever the call site.
+    '''
+
+    @classmethod
+    def _read_type(cls) -> str:
+        raise NotImplementedError()
+
+    def __init__(
+        self, 
+        file_name: str, 
+        encoding: Union[None, str] = None, 
+        buffering: int = -1, 
+        compression: Union[None, str] = _MISSING, 
+        threaded: bool = False
+    ):
+        if 'b' in self.__class__._read_type():
+            if encoding is not None:
+                raise ValueError("binary mode doesn't take an encoding argument")
+        elif encoding is None:
+            encoding = 'utf-8'
+        self.file_name = file_name
+        self.encoding = encoding
+        self.buffering = int(buffering)
+        self.compression = compression
+        self.threaded = threaded
+
+    def _open(self):
+        return _open(
+            self.file_name, self.__class__._read_type(), self.encoding, self.buffering, self.compression, self.threaded
+        )
+
+    def _opt(self, other: Any) -> Any:
+        if isinstance(other, PipeManagerEnd):
+            return iter(self)
+        # stages such as Map / Filter take the stream through their own __ror__
+        if not isinstance(other, type) and hasattr(type(other), '__ror__'):
+            return NotImplemented
+        if isinstance(other, Callable):
+            return other(self)
+        return NotImplemented
+
+    def __or__(self, other):
+        return self._opt(other)
+
+    def __rshift__(self, other):
+        return self._opt(other)
+
+
+class BaseReadLines(BaseReadStream):
+
+    def __init__(
+        self, 
+        file_name: str, 
+        encoding: Union[None, str] = None, 
+        buffering: int = -1, 
+        keepends: bool = True, 
+        compression: Union[None, str] = _MISSING, 
+        threaded: bool = False
+    ):
+        super().__init__(file_name, encoding, buffering, compression, threaded)
+        self.keepends = keepends
+
+    def __iter__(self):
+        with self._open() as f:
+            if self.keepends:
+                yield from f
+                return
+            for line in f:
+                # text mode translates newlines, binary lines may end with \r\n
+                if line[-1:] in ('\n', b'\n'):
+                    line = line[:-2] if line[-2:-1] in ('\r', b'\r') else line[:-1]
+                yield line
+
+
+class BaseReadChunks(BaseReadStream):
+
+    def __init__(
+        self, 
+        file_name: str, 
+        size: int = 65536, 
+        encoding: Union[None, str] = None, 
+        buffering: int = -1, 
+        compression: Union[None, str] = _MISSING, 
+        threaded: bool = False
+    ):
+        if int(size) < 1:
+            raise ValueError("Parameter size must >= 1")
+        super().__init__(file_name, encoding, buffering, compression, threaded)
+        self.size = int(size)
+
+    def __iter__(self):
+        with self._open() as f:
+            read, size = f.read, self.size
+            chunk = read(size)
+            while chunk:
+                yield chunk
+                chunk = read(size)
@@ -0,0 +1,294 @@
+import os
+import time
+import pickle
+import multiprocessing
+from functools import reduce
+from collections import deque
+from itertools import islice
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, Executor, Future, wait, FIRST_COMPLETED
+from typing import Callable, Iterable, Iterator, Any, Tuple, Union, Optional
+from .base import AbstractSelfModifiedClass, _MISSING
+
+# Functions that can't be pickled are parked here before the pool forks,
+# forked workers inherit the table and look them up by token.
+_inherited_funcs = {}
+# Per-process cache of functions shipped as cloudpickle payloads.
+_loaded_funcs = {}
+
+# Adaptive chunking aims at chunks taking about this long in a worker,
+# which keeps IPC overhead small compared with the actual work.
+_TARGET_CHUNK_TIME = 0.02
+_MAX_CHUNKSIZE = 65536
+
+
+def _load_func(payload: Tuple[str, Any]) -> Callable:
+    kind, value = payload
+    if kind == 'object':
+        return value
+    elif kind == 'inherited':
+        return _inherited_funcs[value]
+    func = _loaded_funcs.get(value)
+    if func is None:
+        func = _loaded_funcs[value] = pickle.loads(value)
+    return func
+
+
+def _run_chunk(payload: Tuple[str, Any], chunk: list) -> Tuple[list, float]:
+    func = _load_func(payload)
+    st_time = time.perf_counter()
+    result = [func(item) for item in chunk]
+    return result, time.perf_counter() - st_time
+
+
+def _reduce_chunk(payload: Tuple[str, Any], chunk: list, initializer: Tuple[bool, Any]) -> Tuple[Any, int, float]:
+    func = _load_func(payload)
+    st_time = time.perf_counter()
+    has_initializer, value = initializer
+    result = reduce(func, chunk, value) if has_initializer else reduce(func, chunk)
+    return result, len(chunk), time.perf_counter() - st_time
+
+
+def _func_payload(func: Callable, mp_context: Any, external: bool = False) -> Tuple[str, Any]:
+    '''
+    Decide how to ship `func` to worker processes:
+    1. functions picklable by reference (module level) are sent as they are.
+    2. lambdas / closures are serialized by value with cloudpickle, if installed.
+    3. otherwise, with the fork start method, workers inherit them from the parent.
+       Only pools started here qualify, workers of an `external` pool may have 
+       been forked before the function was registered.
+    '''
+    try:
+        pickle.dumps(func)
+        return ('object', func)
+    except Exception:
+        pass
+    try:
+        import cloudpickle
+    except ImportError:
+        cloudpickle = None
+    if cloudpickle is not None:
+        return ('cloudpickle', cloudpickle.dumps(func))
+    if mp_context.get_start_method() == 'fork' and external:
+        raise TypeError(
+            f"{func!r} can't be pickled for the workers of an existing executor, define it at module level, "
+            "install `cloudpickle`, or let the stage start its own pool."
+        )
+    if mp_context.get_start_method() == 'fork':
+        token = f'{os.getpid()}-{id(func)}'
+        _inherited_funcs[token] = func
+        return ('inherited', token)
+    raise TypeError(
+        f"{func!r} can't be pickled for worker processes, define it at module level "
+        "or install `cloudpickle` to pass lambdas and closures."
+    )
+
+
+def _next_chunksize(chunksize: int, items: int, elapsed: float) -> int:
+    if items <= 0:
+        return chunksize
+    if elapsed <= 0:
+        return min(chunksize * 2, _MAX_CHUNKSIZE)
+    wanted = int(_TARGET_CHUNK_TIME * items / elapsed)
+    # move gradually so a single noisy measurement can't swing the size too far
+    return max(1, min(wanted, chunksize * 2, _MAX_CHUNKSIZE))
+
+
+def _bounded_map(submit: Callable[[Any], Future], tasks: Iterable, max_pending: int, ordered: bool) -> Iterator:
+    '''
+    Submit `tasks` one by one and yield their results, keeping at most `max_pending`
+    of them in flight. Upstream is only pulled when a slot frees up, which gives 
+    natural backpressure and keeps memory flat on unbounded inputs.
+    '''
+    it = iter(tasks)
+    pending = deque()
+    try:
+        while True:
+            for task in islice(it, max_pending - len(pending)):
+                pending.append(submit(task))
+            if not pending:
+                return
+            if ordered:
+                yield pending.popleft().result()
+            else:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    pending.remove(future)
+                for future in done:
+                    yield future.result()
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def _tree_reduce(
+    func: Callable, 
+    _iter: Iterable, 
+    initializer: Any, 
+    combine: Optional[Callable], 
+    workers: Optional[int], 
+    chunksize: Optional[int], 
+    executor: Union[str, Executor]
+) -> Any:
+    '''
+    Reduce chunks of `_iter` in parallel, then combine partial results pairwise. 
+    Chunk order is kept, so `func` has to be associative but not commutative.
+    Without `combine`, chunks are reduced by `func` alone and `initializer` is 
+    folded in once at the end; with `combine`, each chunk starts from `initializer`.
+    '''
+    workers = workers or os.cpu_count() or 1
+    has_initializer = initializer is not _MISSING
+    chunk_initializer = (has_initializer and combine is not None, None if initializer is _MISSING else initializer)
+    owned = isinstance(executor, str)
+    if executor == 'process':
+        mp_context = multiprocessing.get_context()
+        payload = _func_payload(func, mp_context)
+        pool = ProcessPoolExecutor(workers, mp_context=mp_context)
+    elif executor == 'thread':
+        payload = ('object', func)
+        pool = ThreadPoolExecutor(workers)
+    elif isinstance(executor, Executor):
+        payload = _func_payload(func, multiprocessing.get_context(), external=True) if isinstance(executor, ProcessPoolExecutor) else ('object', func)
+        pool = executor
+    else:
+        raise ValueError("Parameter executor must be 'process', 'thread' or an Executor instance")
+
+    it = iter(_iter)
+    size = [chunksize or 1]
+    chunks = iter(lambda: list(islice(it, size[0])), [])
+    submit = lambda chunk: pool.submit(_reduce_chunk, payload, chunk, chunk_initializer)
+    partials = []
+    try:
+        for result, items, elapsed in _bounded_map(submit, chunks, workers * 2, True):
+            if chunksize is None:
+                size[0] = _next_chunksize(size[0], items, elapsed)
+            partials.append(result)
+    finally:
+        if owned:
+            pool.shutdown(wait=True, cancel_futures=True)
+        if payload[0] == 'inherited':
+            _inherited_funcs.pop(payload[1], None)
+
+    merge = combine or func
+    while len(partials) > 1:
+        paired = [merge(partials[i], partials[i + 1]) for i in range(0, len(partials) - 1, 2)]
+        if len(partials) % 2:
+            paired.append(partials[-1])
+        partials = paired
+    if not partials:
+        if has_initializer:
+            return initializer
+        raise TypeError("reduce() of empty iterable with no initial value")
+    if has_initializer and combine is None:
+        return func(initializer, partials[0])
+    return partials[0]
+
+
+class ParallelMap(AbstractSelfModifiedClass):
+    '''
+    Map over a process pool, for CPU-bound functions.
+    Usage:
+    >>> range(100) | ParallelMap(heavy, workers=4) | list
+    # results in arbitrary order, as soon as any worker finishes
+    >>> range(100) | ParallelMap(heavy, ordered=False) | list
+    Items are sent to workers in chunks, the chunk size adapts to the measured 
+    cost of `func` unless given explicitly. Results are streamed back lazily 
+    with a bounded number of chunks in flight.
+    Lambdas and closures are shipped with `cloudpickle` when it is installed, 
+    on platforms using the fork start method they also work without it, as long 
+    as the stage starts its own pool.
+    An existing executor can be passed in to avoid starting a new pool on every run.
+    '''
+
+    def __init__(
+        self, 
+        func: Callable, 
+        workers: Optional[int] = None, 
+        chunksize: Optional[int] = None, 
+        ordered: bool = True, 
+        executor: Optional[Executor] = None,
+        mp_context: Any = None
+    ):
+        if workers is not None and workers < 1:
+            raise ValueError("Parameter workers must >= 1")
+        if chunksize is not None and chunksize < 1:
+            raise ValueError("Parameter chunksize must >= 1")
+        self._func = func
+        self._storage = None
+        self._workers = workers or os.cpu_count() or 1
+        self._chunksize = chunksize
+        self._ordered = ordered
+        self._executor = executor
+        self._mp_context = mp_context
+
+    def _exec(self, _iter: Iterable) -> Iterator:
+        return self._stream(_iter)
+
+    def _stream(self, _iter: Iterable) -> Iterator:
+        mp_context = self._mp_context or multiprocessing.get_context()
+        payload = _func_payload(self._func, mp_context, external=self._executor is not None)
+        executor = self._executor
+        owned = executor is None
+        if owned:
+            executor = ProcessPoolExecutor(self._workers, mp_context=mp_context)
+        it = iter(_iter)
+        # chunk size is read lazily, so adaptation applies to the next chunk pulled
+        size = [self._chunksize or 1]
+        chunks = iter(lambda: list(islice(it, size[0])), [])
+        submit = lambda chunk: executor.submit(_run_chunk, payload, chunk)
+        try:
+            for result, elapsed in _bounded_map(submit, chunks, self._workers * 2, self._ordered):
+                if self._chunksize is None:
+                    size[0] = _next_chunksize(size[0], len(result), elapsed)
+                yield from result
+        finally:
+            if owned:
+                executor.shutdown(wait=True, cancel_futures=True)
+            if payload[0] == 'inherited':
+                _inherited_funcs.pop(payload[1], None)
+
+
+class ConcurrentMap(AbstractSelfModifiedClass):
+    '''
+    Map over a thread pool, for I/O-bound functions.
+    Usage:
+    >>> urls | ConcurrentMap(fetch, threads=16) | list
+    >>> PIPE | paths | ConcurrentMap(os.path.getsize, threads=8, max_inflight=32) | sum | END
+    At most `max_inflight` items (default: twice the number of threads) are 
+    submitted but not yet consumed, upstream is only pulled as results are taken,
+    so a huge source is never drained into memory. Results keep the input order 
+    unless `ordered=False`.
+    '''
+
+    def __init__(
+        self, 
+        func: Callable, 
+        threads: int = 8, 
+        max_inflight: Optional[int] = None, 
+        ordered: bool = True, 
+        executor: Optional[Executor] = None
+    ):
+        if threads < 1:
+            raise ValueError("Parameter threads must >= 1")
+        if max_inflight is not None and max_inflight < 1:
+            raise ValueError("Parameter max_inflight must >= 1")
+        self._func = func
+        self._storage = None
+        self._threads = threads
+        self._max_inflight = max_inflight or threads * 2
+        self._ordered = ordered
+        self._executor = executor
+
+    def _exec(self, _iter: Iterable) -> Iterator:
+        return self._stream(_iter)
+
+    def _stream(self, _iter: Iterable) -> Iterator:
+        executor = self._executor
+        owned = executor is None
+        if owned:
+            executor = ThreadPoolExecutor(self._threads)
+        submit = lambda item: executor.submit(self._func, item)
+        try:
+            yield from _bounded_map(submit, _iter, self._max_inflight, self._ordered)
+        finally:
+            if owned:
+                executor.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,143 @@
+from inspect import CO_VARARGS, CO_VARKEYWORDS
+from typing import Callable, Any, Iterable, Tuple, List
+from .base import AbstractSelfModifiedClass, _RightOperand
+from .wrapper import Map, Filter, Fused, Take
+from .parallel import ParallelMap, ConcurrentMap
+
+class Plan(_RightOperand):
+    '''
+    An immutable, source-less pipeline. Chaining stages without a source 
+    builds a plan, which can be applied to any number of inputs:
+    >>> plan = Map(lambda x: x + 1) | Filter(lambda x: x % 2) | Reduce(lambda x, y: x + y)
+    >>> range(10) | plan
+    25
+    >>> plan(range(5))
+    9
+    Plans only call the stateless `_exec` of their stages, so they are reentrant
+    and can be built once at import time and shared between threads. Runs of 
+    consecutive Map / Filter stages are fused into a single loop (see `Fused`).
+    `optimize()` returns a rewritten plan, `explain()` shows what it does.
+    '''
+
+    __slots__ = ('_stages', '_runner')
+
+    def __init__(self, stages: Iterable[Any]):
+        flattened = []
+        for stage in stages:
+            if isinstance(stage, Plan):
+                flattened.extend(stage._stages)
+            else:
+                flattened.append(stage)
+        object.__setattr__(self, '_stages', tuple(flattened))
+        object.__setattr__(self, '_runner', _compile(self._stages))
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("Plan object is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError("Plan object is immutable")
+
+    def __call__(self, _iter: Any) -> Any:
+        for step in self._runner:
+            _iter = step(_iter)
+        return _iter
+
+    def __ror__(self, _iter: Any) -> Any:
+        return self(_iter)
+
+    def __or__(self, other: Any) -> 'Plan':
+        if isinstance(other, (Plan, AbstractSelfModifiedClass)):
+            return Plan((self, other))
+        elif isinstance(other, tuple):
+            raise SyntaxError("Not allowed to mix use different wrapper call.")
+        elif isinstance(other, Callable):
+            return Plan((self, other))
+        raise RuntimeError("Only stages and callables are allowed to be chained into a plan.")
+
+    def optimize(self) -> 'Plan':
+        '''
+        Rewrite the plan, dropping no-op stages, moving `Take` limits ahead of 
+        1:1 maps and running `Filter(..., independent=True)` before them.
+        '''
+        return Plan(_optimize(list(self._stages)))
+
+    def explain(self) -> str:
+        optimized = self.optimize()
+        lines = ['== Logical plan ==']
+        lines.extend(f'{i}. {_stage_name(stage)}' for i, stage in enumerate(self._stages))
+        lines.append('== Optimized plan ==')
+        for i, group in enumerate(_fusion_groups(optimized._stages)):
+            names = ' | '.join(_stage_name(stage) for stage in group)
+            lines.append(f'{i}. Fused[{names}]' if len(group) > 1 else f'{i}. {names}')
+        return '\n'.join(lines)
+
+    def __len__(self) -> int:
+        return len(self._stages)
+
+    def __repr__(self) -> str:
+        return f"Plan({' | '.join(_stage_name(stage) for stage in self._stages)})"
+
+
+def _stage_name(stage: Any) -> str:
+    if isinstance(stage, Take):
+        return f'Take({stage._n})'
+    if isinstance(stage, AbstractSelfModifiedClass):
+        func = getattr(stage, '_func', None)
+        return f"{type(stage).__name__}({getattr(func, '__name__', repr(func))})"
+    return getattr(stage, '__name__', repr(stage))
+
+
+def _fusion_groups(stages: Tuple[Any, ...]) -> List[List[Any]]:
+    groups = []
+    for stage in stages:
+        if type(stage) in (Map, Filter) and groups and type(groups[-1][-1]) in (Map, Filter):
+            groups[-1].append(stage)
+        else:
+            groups.append([stage])
+    return groups
+
+
+def _compile(stages: Tuple[Any, ...]) -> Tuple[Callable, ...]:
+    runner = []
+    for group in _fusion_groups(stages):
+        stage = group[0]
+        if len(group) > 1:
+            runner.append(Fused(*group)._exec)
+        elif isinstance(stage, AbstractSelfModifiedClass):
+            runner.append(stage._exec)
+        else:
+            runner.append(stage)
+    return tuple(runner)
+
+
+_IDENTITY_CODE = (lambda x: x).__code__.co_code
+# stages producing exactly one output per input, without looking at other items
+_ONE_TO_ONE = (Map, ParallelMap, ConcurrentMap)
+
+
+def _is_identity(func: Any) -> bool:
+    code = getattr(func, '__code__', None)
+    return (
+        code is not None and code.co_argcount == 1 and not code.co_kwonlyargcount 
+        and not code.co_flags & (CO_VARARGS | CO_VARKEYWORDS) and code.co_code == _IDENTITY_CODE
+    )
+
+
+def _optimize(stages: List[Any]) -> List[Any]:
+    # drop no-op stages
+    stages = [stage for stage in stages if not (type(stage) is Map and _is_identity(stage._func))]
+    # push limits and independent filters upstream of 1:1 maps, merge adjacent limits
+    changed = True
+    while changed:
+        changed = False
+        for i in range(1, len(stages)):
+            prev, stage = stages[i - 1], stages[i]
+            if isinstance(stage, Take) and isinstance(prev, Take):
+                stages[i - 1:i + 1] = [Take(min(prev._n, stage._n))]
+                changed = True
+                break
+            movable = isinstance(stage, Take) or (type(stage) is Filter and stage._independent)
+            if movable and isinstance(prev, _ONE_TO_ONE):
+                stages[i - 1], stages[i] = stage, prev
+                changed = True
+    return stages
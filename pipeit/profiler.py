@@ -0,0 +1,113 @@
+import json
+import time
+from collections.abc import Iterator, Sized
+from typing import Any, Dict
+from .base import AbstractSelfModifiedClass, _RightOperand
+from .plan import Plan, _stage_name
+
+
+class _StageStats:
+
+    __slots__ = ('name', 'time', 'items_in', 'items_out', 'upstream')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.time = 0.0
+        self.items_in = None
+        self.items_out = 0
+        # stats of the lazy stage feeding this one, its output count is our input
+        self.upstream = None
+
+
+class _TimedIterator:
+    '''Counts items and accumulates time spent in `next()`, upstream included.'''
+
+    __slots__ = ('_it', '_stats')
+
+    def __init__(self, it: Iterator, stats: _StageStats):
+        self._it = it
+        self._stats = stats
+
+    def __iter__(self) -> '_TimedIterator':
+        return self
+
+    def __next__(self) -> Any:
+        stats = self._stats
+        st_time = time.perf_counter()
+        try:
+            item = next(self._it)
+        finally:
+            stats.time += time.perf_counter() - st_time
+        stats.items_out += 1
+        return item
+
+
+class Profiled(_RightOperand):
+    '''
+    Run a plan stage by stage, recording wall time and element counts of each stage.
+    Usage:
+    >>> prof = Profiled(Filter(lambda x: x % 3) | Map(lambda x: 10 * x) | Reduce(lambda x, y: x + y))
+    >>> range(1000) | prof
+    3333000
+    >>> prof.report()
+    {'total_time': ..., 'stages': [{'stage': 'Filter(<lambda>)', 'time': ..., 'items_in': 1000, 'items_out': 666, ...}, ...]}
+    Lazy stages are timed while their items are pulled, `time` excludes the time 
+    spent in upstream stages. Fusion is disabled so every stage shows up on its 
+    own. Only the wrapped plan pays for instrumentation, and as the report of 
+    the last run is kept on the object, use one `Profiled` per thread.
+    '''
+
+    def __init__(self, *stages: Any):
+        self._plan = Plan(stages)
+        self._source = _StageStats('source')
+        self._stats = []
+
+    def __call__(self, _iter: Any) -> Any:
+        source = _StageStats('source')
+        stats = [_StageStats(_stage_name(stage)) for stage in self._plan._stages]
+        self._source, self._stats = source, stats
+        value, upstream = _iter, source
+        if isinstance(value, Iterator):
+            value = _TimedIterator(value, source)
+        else:
+            source.items_out = len(value) if isinstance(value, Sized) else None
+        for stage, stage_stats in zip(self._plan._stages, stats):
+            if isinstance(value, _TimedIterator):
+                stage_stats.upstream = upstream
+            else:
+                stage_stats.items_in = len(value) if isinstance(value, Sized) else None
+            func = stage._exec if isinstance(stage, AbstractSelfModifiedClass) else stage
+            st_time = time.perf_counter()
+            value = func(value)
+            stage_stats.time += time.perf_counter() - st_time
+            if isinstance(value, Iterator):
+                value = _TimedIterator(value, stage_stats)
+            else:
+                stage_stats.items_out = len(value) if isinstance(value, Sized) else 1
+            upstream = stage_stats
+        return value
+
+    def __ror__(self, _iter: Any) -> Any:
+        return self(_iter)
+
+    def report(self) -> Dict[str, Any]:
+        stages = []
+        upstream_time = self._source.time
+        for stats in self._stats:
+            own_time = max(stats.time - upstream_time, 0.0)
+            upstream_time = stats.time
+            items_in = stats.items_in if stats.upstream is None else stats.upstream.items_out
+            processed = stats.items_out if items_in is None else items_in
+            stages.append({
+                'stage': stats.name,
+                'time': own_time,
+                'inclusive_time': stats.time,
+                'items_in': items_in,
+                'items_out': stats.items_out,
+                # items processed per second
+                'throughput': processed / own_time if own_time > 0 else None,
+            })
+        return {'total_time': upstream_time, 'stages': stages}
+
+    def to_json(self, **kwargs: Any) -> str:
+        return json.dumps(self.report(), **kwargs)
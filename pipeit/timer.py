@@ -1,6 +1,335 @@
+import gc
+import sys
+import asyncio
+import ast
 import time
+import linecache
+import statistics
+import tracemalloc
 from inspect import stack
 from numbers import Number
+from types import FrameType, CodeType, FunctionType
+from typing import List, Dict, Tuple, FrozenSet, Any, Optional, NamedTuple, Callable, Awaitable
+
+
+class MemoryUsage(NamedTuple):
+    '''
+    Allocations traced by `timeit(memory = True)`, sizes in bytes. `peak` is the 
+    highest traced memory above the level at the start of the block, `net` what 
+    is still allocated at its end, and `top` the source lines retaining the most 
+    memory as (location, bytes, blocks) tuples.
+    '''
+    peak: int
+    net: int
+    per_loop: float
+    blocks: int
+    top: List[Tuple[str, int, int]]
+
+
+class _MemoryTracer:
+    '''Measure the allocations of a block with tracemalloc snapshots.'''
+
+    _filters = (
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+        tracemalloc.Filter(False, linecache.__file__),
+    )
+
+    def __init__(self, top: int):
+        self._top = top
+        self._active = False
+
+    def start(self) -> None:
+        self._active = True
+        self._was_tracing = tracemalloc.is_tracing()
+        if not self._was_tracing:
+            tracemalloc.start()
+        self._snapshot = tracemalloc.take_snapshot().filter_traces(self._filters)
+        self._start_size = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+
+    def stop(self, loops: int) -> MemoryUsage:
+        current, peak = tracemalloc.get_traced_memory()
+        stats = tracemalloc.take_snapshot().filter_traces(self._filters).compare_to(self._snapshot, 'lineno')
+        self.abort()
+        net = current - self._start_size
+        top = [
+            (f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}", stat.size_diff, stat.count_diff) 
+            for stat in stats[:self._top] if stat.size_diff > 0
+        ]
+        return MemoryUsage(
+            peak = max(peak - self._start_size, 0), 
+            net = net, 
+            per_loop = net / max(loops, 1), 
+            blocks = sum(stat.count_diff for stat in stats), 
+            top = top
+        )
+
+    def abort(self) -> None:
+        '''Stop tracing without a result, when the timed block was left early.'''
+        if self._active and not self._was_tracing:
+            tracemalloc.stop()
+        self._active = False
+        self._snapshot = None
+
+
+class LoopLag(NamedTuple):
+    '''
+    Event loop lag seen by a ticker task sleeping `interval` seconds while an 
+    async block is timed: how late (in seconds) the ticker was woken up. High 
+    values mean something blocked the loop.
+    '''
+    interval: float
+    samples: int
+    mean: float
+    max: float
+    p95: float
+
+
+class _LagMonitor:
+    '''Ticker task measuring how late the event loop wakes it up.'''
+
+    def __init__(self, interval: float):
+        self._interval = interval
+        self._lags = []
+        self._task = None
+
+    async def _tick(self) -> None:
+        clock, interval, lags = time.perf_counter, self._interval, self._lags
+        while True:
+            st_time = clock()
+            await asyncio.sleep(interval)
+            lags.append(max(clock() - st_time - interval, 0))
+
+    def start(self) -> None:
+        self._lags.clear()
+        self._task = asyncio.ensure_future(self._tick())
+
+    async def stop(self) -> LoopLag:
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        lags = sorted(self._lags) or [0.0]
+        return LoopLag(
+            interval = self._interval, 
+            samples = len(self._lags), 
+            mean = statistics.fmean(lags), 
+            max = lags[-1], 
+            p95 = lags[min(int(len(lags) * 0.95), len(lags) - 1)]
+        )
+
+
+def _format_bytes(size: float) -> str:
+    for unit in ('B', 'KiB', 'MiB'):
+        if abs(size) < 1024:
+            return f"{size:.4g}{unit}"
+        size /= 1024
+    return f"{size:.4g}GiB"
+
+
+class TimeitResult:
+    '''
+    Samples collected by `timeit`, in seconds. For the iterator form there is 
+    one sample per repeat holding the time of a single loop, for the context 
+    manager form a single sample with the time of the whole block, and for 
+    `atimeit` one sample per call holding its latency.
+    '''
+
+    def __init__(
+        self, 
+        name: str, 
+        mode: str, 
+        loops: int, 
+        samples: List[float], 
+        total: float, 
+        memory: Optional[MemoryUsage] = None, 
+        lag: Optional[LoopLag] = None
+    ):
+        self.name = name
+        self.mode = mode
+        self.loops = loops
+        self.samples = samples
+        self.total = total
+        self.memory = memory
+        self.lag = lag
+
+    @property
+    def min(self) -> float:
+        return min(self.samples)
+
+    @property
+    def max(self) -> float:
+        return max(self.samples)
+
+    @property
+    def mean(self) -> float:
+        return statistics.fmean(self.samples)
+
+    @property
+    def median(self) -> float:
+        return statistics.median(self.samples)
+
+    @property
+    def stdev(self) -> float:
+        return statistics.stdev(self.samples) if len(self.samples) > 1 else 0.0
+
+    @property
+    def p95(self) -> float:
+        return self.percentile(95)
+
+    @property
+    def mad(self) -> float:
+        '''Median absolute deviation, a spread estimate that ignores outliers.'''
+        median = self.median
+        return statistics.median(abs(x - median) for x in self.samples)
+
+    @property
+    def outliers(self) -> int:
+        '''Number of samples outside 1.5 IQR of the quartiles (Tukey's fences).'''
+        if len(self.samples) < 4:
+            return 0
+        q1, _, q3 = statistics.quantiles(self.samples, n=4)
+        low, high = q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1)
+        return sum(1 for x in self.samples if x < low or x > high)
+
+    def percentile(self, p: float) -> float:
+        ordered = sorted(self.samples)
+        if len(ordered) == 1:
+            return ordered[0]
+        # linear interpolation between closest ranks
+        rank = (len(ordered) - 1) * p / 100
+        low = int(rank)
+        high = min(low + 1, len(ordered) - 1)
+        return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'mode': self.mode,
+            'loops': self.loops,
+            'repeat': len(self.samples),
+            'samples': list(self.samples),
+            'total': self.total,
+            'min': self.min,
+            'max': self.max,
+            'mean': self.mean,
+            'median': self.median,
+            'stdev': self.stdev,
+            'p95': self.p95,
+            'mad': self.mad,
+            'outliers': self.outliers,
+            'memory': self.memory._asdict() if self.memory else None,
+            'lag': self.lag._asdict() if self.lag else None,
+        }
+
+    def __repr__(self) -> str:
+        return f"TimeitResult(name={self.name!r}, mode={self.mode!r}, loops={self.loops}, median={self.median}, repeat={len(self.samples)})"
+
+
+class _SkipBody(Exception):
+    '''Raised by the trace hook to skip the body of `with timeit(exact_loops=True)`.'''
+
+
+_LOOP_TEMPLATE = '''
+def __pipeit_exact_loop(__loops, __range, __clock{params}):
+    __st_time = __clock()
+    for {target} in __range(__loops):
+        pass
+    return __clock() - __st_time
+'''
+
+# (code object, line) of a timed block -> (statement, loop target, names read, names assigned, globals)
+_exact_blocks: Dict[Tuple[CodeType, int], Tuple[ast.AST, str, Tuple[str, ...], FrozenSet[str], List[str]]] = {}
+# (code object, line, names to pass in) -> (compiled loop, blank loop)
+_exact_cache: Dict[Tuple[CodeType, int, Tuple[str, ...]], Tuple[CodeType, CodeType]] = {}
+
+
+def _find_timed_block(frame: FrameType) -> ast.AST:
+    lineno = frame.f_lineno
+    source = ''.join(linecache.getlines(frame.f_code.co_filename, frame.f_globals))
+    if not source:
+        raise RuntimeError("exact_loops needs the source code of the timed block, which is not available.")
+    found = None
+    for node in ast.walk(ast.parse(source)):
+        if isinstance(node, (ast.With, ast.For)) and node.lineno <= lineno < node.body[0].lineno:
+            if found is None or node.lineno >= found.lineno:
+                found = node
+    if found is None:
+        raise RuntimeError(f"No `with` / `for` statement using timeit found at line {lineno}.")
+    for child in ast.walk(ast.Module(body=found.body, type_ignores=[])):
+        if isinstance(child, (ast.Return, ast.Yield, ast.YieldFrom, ast.Await)):
+            raise SyntaxError("`return`, `yield` and `await` are not allowed in a block timed with exact_loops.")
+    return found
+
+
+def _analyze_timed_block(frame: FrameType) -> Tuple[ast.AST, str, Tuple[str, ...], FrozenSet[str], List[str]]:
+    key = (frame.f_code, frame.f_lineno)
+    if key in _exact_blocks:
+        return _exact_blocks[key]
+    node = _find_timed_block(frame)
+    target = ast.unparse(node.target) if isinstance(node, ast.For) else '__pipeit_i'
+    targets = {child.id for child in ast.walk(node.target) if isinstance(child, ast.Name)} if isinstance(node, ast.For) else set()
+    # names read by the body, `x += 1` reads x as well
+    augmented = {
+        child.target for stmt in node.body for child in ast.walk(stmt) if isinstance(child, ast.AugAssign)
+    }
+    reads = {
+        child.id for stmt in node.body for child in ast.walk(stmt) 
+        if isinstance(child, ast.Name) and child.id not in targets and (isinstance(child.ctx, ast.Load) or child in augmented)
+    }
+    # names bound by the body, comprehension variables included
+    assigned = frozenset(
+        child.id for stmt in node.body for child in ast.walk(stmt) 
+        if isinstance(child, ast.Name) and isinstance(child.ctx, (ast.Store, ast.Del)) and child.id not in targets
+    )
+    # module level code reads everything from globals, like the original statement, 
+    # and assigns globals as well, e.g. `x += 1`
+    code = frame.f_code
+    if frame.f_locals is frame.f_globals:
+        reads, global_names = (), sorted(assigned)
+    else:
+        local_names = set(code.co_varnames + code.co_cellvars + code.co_freevars)
+        reads, global_names = tuple(sorted(reads & local_names)), []
+    _exact_blocks[key] = (node, target, reads, assigned, global_names)
+    return _exact_blocks[key]
+
+
+def _compile_timed_block(frame: FrameType) -> Tuple[CodeType, CodeType, Tuple[str, ...]]:
+    '''
+    Rewrite the body of the `with` / `for` statement at the current line of 
+    `frame` into a function running it in a plain `for ... in range(loops)` loop.
+    Local variables of the caller bound at this point and used by the body 
+    become arguments, so they are fast locals just like in the original code; 
+    temporaries of the body stay locals of the function. At module level, 
+    names assigned by the body are declared global instead.
+    '''
+    node, target, reads, assigned, global_names = _analyze_timed_block(frame)
+    f_locals = frame.f_locals
+    for name in reads:
+        if name not in f_locals and name not in assigned:
+            raise NameError(f"local variable '{name}' referenced before assignment")
+    params = tuple(name for name in reads if name in f_locals)
+    key = (frame.f_code, frame.f_lineno, params)
+    if key not in _exact_cache:
+        codes = []
+        for body in (node.body, None):
+            module = ast.parse(_LOOP_TEMPLATE.format(params=''.join(f', {name}' for name in params), target=target))
+            # the loop itself points at the timed statement, the body keeps its own 
+            # line numbers for tracebacks and tracemalloc
+            for child in ast.walk(module):
+                if 'lineno' in child._attributes:
+                    child.lineno = child.end_lineno = node.lineno
+            if body is not None:
+                module.body[0].body[1].body = body
+                if global_names:
+                    module.body[0].body.insert(0, ast.copy_location(ast.Global(names=global_names), node))
+            module = compile(module, frame.f_code.co_filename, 'exec')
+            codes.append(next(const for const in module.co_consts if isinstance(const, CodeType)))
+        _exact_cache[key] = tuple(codes)
+    return _exact_cache[key] + (params, )
+
 
 class timeit:
     '''
@@ -21,6 +350,34 @@ class timeit:
     # The default is to use peeloff mode, which re-executes the iterator with empty body 
     # and subtracts this amount of time. This can increase the precision of the result, 
     # you can turn it off manually if you don't like it.
+    3.
+    # exact_loops rewrites the body into a tight loop executed `loops` times and 
+    # skips the original body, so even tiny expressions can be measured accurately
+    >>> with timeit(1e7, exact_loops = True):
+    >>>     x = a + 1
+    [line 1][exact_loops] time cost / loop: 0.0121μs, total time 0.1412s
+    4.
+    # Repeat the measurement after some warmup rounds, with the garbage collector 
+    # paused, and keep the statistics instead of only printing them
+    >>> t = timeit(1e5, repeat = 7, warmup = 1, disable_gc = True, verbose = False)
+    >>> for _ in t:
+    >>>     ''.join(['1']*100)
+    >>> t.result.median, t.result.p95, t.result.to_dict()
+    5.
+    # Trace allocations of the block as well, with the 3 source lines retaining 
+    # the most memory. Note that tracing slows the timed code down
+    >>> with timeit(memory = True, memory_top = 3):
+    >>>     bar = list(range(100000))
+    [line 1][exact] time cost: 0.0102s
+    [line 1][memory] peak 3.815MiB, net 3.815MiB, 3.815MiB / loop, 100001 blocks
+        example.py:2: 3.815MiB in 100001 blocks
+    6.
+    # Inside coroutines, time an awaited block and the lag of the event loop 
+    # meanwhile, sampled by a ticker task every `lag_interval` seconds
+    >>> async with timeit():
+    >>>     await asyncio.gather(*(fetch(url) for url in urls))
+    [line 1][exact] time cost: 0.2034s
+    [line 1][loop lag] mean 0.0832ms, p95 0.1204ms, max 1.032ms, 175 ticks
     '''
 
     instance_no = 0
@@ -31,18 +388,76 @@ class timeit:
         cls.instance_no += 1
         return instance
 
-    def __init__(self, loops: Number = 1, name: str = "", peel_off: bool = True):
+    def __init__(
+        self, 
+        loops: Number = 1, 
+        name: str = "", 
+        peel_off: bool = True, 
+        repeat: int = 1, 
+        warmup: int = 0, 
+        disable_gc: bool = False, 
+        verbose: bool = True, 
+        exact_loops: bool = False, 
+        memory: bool = False, 
+        memory_top: int = 0, 
+        lag_interval: float = 0.001
+    ):
+        if int(repeat) < 1 or int(warmup) < 0:
+            raise ValueError("Parameter repeat must >= 1 and warmup must >= 0")
         self._loop_num = int(loops)
         self.display_name = f'[{name}]' if name != '' else f'[line {stack()[1].lineno}]'
+        self._name = name
         self._count = 0
         self._mode = None
         self._peel_off = peel_off
-        self._poff_firstloop_flag = True
+        self._repeat = int(repeat)
+        self._warmup = int(warmup)
+        self._disable_gc = disable_gc
+        self._verbose = verbose
+        self._exact_loops = exact_loops
+        self._memory = _MemoryTracer(int(memory_top)) if memory or memory_top else None
+        self._lag_interval = float(lag_interval)
+        self._peeling = False
+        self._pass_times = []
+        self._gc_was_enabled = None
+        self.result: Optional[TimeitResult] = None
 
     def __iter__(self):
+        if self._peeling:
+            return self._passes()
+        if self._exact_loops:
+            # the body has already been run by the compiled loop, skip the original one
+            self._run_exact(sys._getframe(1))
+            return iter(())
         self._mode = 'approximate'
-        self._st_time = time.perf_counter_ns()       
-        return self 
+        self._pass_times = []
+        self._count = 0
+        if self._memory:
+            self._memory.start()
+        self._pause_gc()
+        return self._passes()
+
+    def _passes(self):
+        '''
+        Drive __next__ from a generator, so that leaving the timed loop early by 
+        `break` or an exception still restores the garbage collector. The blank 
+        loop of the peel off goes through the same generator, keeping its 
+        overhead out of the result.
+        '''
+        next_ = self.__next__
+        self._st_time = time.perf_counter_ns()
+        try:
+            while True:
+                try:
+                    count = next_()
+                except StopIteration:
+                    return
+                yield count
+        finally:
+            if not self._peeling:
+                self._resume_gc()
+                if self._memory:
+                    self._memory.abort()
 
     def __next__(self):
         '''
@@ -69,54 +484,244 @@ class timeit:
         if ret < self._loop_num:
             self._count += 1
             return ret 
-        else:
-            self._ed_time = time.perf_counter_ns()
-            if self._peel_off:
-                if self._poff_firstloop_flag:
-                    self._t_storage = self._ed_time - self._st_time
-                    self._poff_firstloop_flag = False
-                    self._count = 0
-                    # limit max blank loop times under 1e7 for normal cpus / at py3.9 performance
-                    self._amplifier = 1
-                    self._ln_buffer = self._loop_num
-                    if self._loop_num > 1e7:
-                        self._amplifier = self._loop_num / 1e7
-                        self._loop_num = int(1e7)
-                    for _ in self:
-                        None
-                else:
-                    self._poff_storage = (self._ed_time - self._st_time) * self._amplifier
-                    self._loop_num = self._ln_buffer
-                    raise StopIteration
-            self._sout()
+        return self._end_pass()
+
+    def _end_pass(self):
+        ed_time = time.perf_counter_ns()
+        if self._peeling:
+            self._ed_time = ed_time
             raise StopIteration
+        self._pass_times.append(ed_time - self._st_time)
+        if len(self._pass_times) < self._warmup + self._repeat:
+            self._count = 1
+            self._st_time = time.perf_counter_ns()
+            return 0
+        memory = self._memory.stop(self._loop_num * len(self._pass_times)) if self._memory else None
+        poff_time = 0
+        if self._peel_off:
+            poff_time = self._blank_loop()
+        self._resume_gc()
+        samples = [max(t - poff_time, 0) / 1e9 / self._loop_num for t in self._pass_times[self._warmup:]]
+        self._t_storage = sum(self._pass_times[self._warmup:])
+        self.result = TimeitResult(self._name, self._mode, self._loop_num, samples, self._t_storage / 1e9, memory)
+        if self._verbose:
+            self._sout()
+        raise StopIteration
+
+    def _blank_loop(self) -> float:
+        # limit max blank loop times under 1e7 for normal cpus / at py3.9 performance
+        amplifier = 1
+        ln_buffer = self._loop_num
+        if self._loop_num > 1e7:
+            amplifier = self._loop_num / 1e7
+            self._loop_num = int(1e7)
+        self._peeling = True
+        self._count = 0
+        for _ in self:
+            None
+        self._peeling = False
+        self._loop_num = ln_buffer
+        return (self._ed_time - self._st_time) * amplifier
+
+    def _pause_gc(self):
+        if self._disable_gc:
+            self._gc_was_enabled = gc.isenabled()
+            gc.disable()
+
+    def _resume_gc(self):
+        if self._disable_gc and self._gc_was_enabled:
+            gc.enable()
+        self._gc_was_enabled = None
+
+    def _run_exact(self, frame: FrameType) -> None:
+        self._mode = 'exact_loops'
+        loop_code, blank_code, params = _compile_timed_block(frame)
+        f_locals = frame.f_locals
+        args = [f_locals[name] for name in params]
+        loop = FunctionType(loop_code, frame.f_globals)
+        blank = FunctionType(blank_code, frame.f_globals)
+        loops, clock = self._loop_num, time.perf_counter_ns
+        passes, memory = self._warmup + self._repeat, None
+        if self._memory:
+            self._memory.start()
+        self._pause_gc()
+        try:
+            pass_times = [loop(loops, range, clock, *args) for _ in range(passes)]
+            if self._memory:
+                memory = self._memory.stop(loops * passes)
+            poff_time = blank(loops, range, clock, *args) if self._peel_off else 0
+        finally:
+            self._resume_gc()
+            if self._memory:
+                self._memory.abort()
+        pass_times = pass_times[self._warmup:]
+        self._t_storage = sum(pass_times)
+        samples = [max(t - poff_time, 0) / 1e9 / loops for t in pass_times]
+        self.result = TimeitResult(self._name, self._mode, loops, samples, self._t_storage / 1e9, memory)
+        if self._verbose:
+            self._sout()
+
+    def _skip_body(self, frame: FrameType, event: str, arg: Any) -> None:
+        raise _SkipBody()
 
     def __enter__(self):
+        if self._exact_loops:
+            frame = sys._getframe(1)
+            self._run_exact(frame)
+            # raise from the first traced line of the body, __exit__ swallows it
+            self._prev_trace, self._frame = sys.gettrace(), frame
+            sys.settrace(lambda *args: None)
+            frame.f_trace = self._skip_body
+            return self
+        if self._repeat > 1 or self._warmup > 0:
+            raise ValueError("repeat and warmup are only supported by the iterator form or exact_loops mode")
         self._peel_off = False
-        self._st_time = time.perf_counter_ns()
         self._mode = 'exact'
+        if self._memory:
+            self._memory.start()
+        self._pause_gc()
+        self._st_time = time.perf_counter_ns()
         return self
 
     def __exit__(self,exc_type,exc_val,exc_tb):
+        if self._exact_loops:
+            self._frame.f_trace, self._frame = None, None
+            sys.settrace(self._prev_trace)
+            return exc_type is _SkipBody
         self._ed_time = time.perf_counter_ns()
-        self._sout(extra=False)
+        self._resume_gc()
+        memory = self._memory.stop(self._loop_num) if self._memory else None
+        elapsed = max((self._ed_time - self._st_time), 0) / 1e9
+        self.result = TimeitResult(self._name, self._mode, self._loop_num, [elapsed], elapsed, memory)
+        if self._verbose:
+            self._sout(extra=False)
         if exc_val:
             raise exc_val
 
+    async def __aenter__(self):
+        if self._exact_loops or self._repeat > 1 or self._warmup > 0:
+            raise ValueError("exact_loops, repeat and warmup are not supported by `async with timeit()`, use atimeit instead")
+        self._lag = _LagMonitor(self._lag_interval)
+        self._lag.start()
+        self.__enter__()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self._verbose, verbose = False, self._verbose
+        try:
+            self.__exit__(None, None, None)
+        finally:
+            self._verbose = verbose
+            self.result.lag = await self._lag.stop()
+        if self._verbose:
+            self._sout(extra=False)
+        return False
+
+    def _scale(self, seconds: float, extra: bool):
+        # per loop values are shown in μs / ms for large loop numbers
+        if not extra:
+            return seconds, 's'
+        if self._loop_num >= 1000000:
+            return seconds * 1000000, 'μs'
+        elif self._loop_num >= 1000:
+            return seconds * 1000, 'ms'
+        return seconds, 's'
+
     def _sout(self, extra=True):
-        if self._peel_off:
-            time_diff = max(self._t_storage - self._poff_storage, 0) / 1e9
-        else:
-            time_diff = max((self._ed_time - self._st_time),0) / 1e9
-        unit = 's'
-        if extra:
-            if self._loop_num >= 1000000: 
-                time_diff = time_diff * (1000000 / self._loop_num)
-                unit = 'μs'
-            elif self._loop_num >= 1000:
-                time_diff = time_diff * (1000 / self._loop_num)
-                unit = 'ms'
-            else:
-                time_diff = time_diff / self._loop_num
-        # std output
-        print(f"{self.display_name}[{self._mode}] time cost{' / loop'if extra else ''}: {time_diff}{unit}{f', total time {self._t_storage/1e9}s' if extra else ''}")
\ No newline at end of file
+        self._sout_time(extra)
+        memory = self.result.memory
+        if memory is not None:
+            print(
+                f"{self.display_name}[memory] peak {_format_bytes(memory.peak)}, net {_format_bytes(memory.net)}, "
+                f"{_format_bytes(memory.per_loop)} / loop, {memory.blocks} blocks"
+            )
+            for location, size, count in memory.top:
+                print(f"    {location}: {_format_bytes(size)} in {count} blocks")
+        if self.result.lag is not None:
+            _print_lag(self.display_name, self.result.lag)
+
+    def _sout_time(self, extra):
+        result = self.result
+        if len(result.samples) == 1:
+            time_diff, unit = self._scale(result.samples[0], extra)
+            # std output
+            print(f"{self.display_name}[{self._mode}] time cost{' / loop'if extra else ''}: {time_diff}{unit}{f', total time {self._t_storage/1e9}s' if extra else ''}")
+            return
+        scale = lambda value: self._scale(value, extra)[0]
+        unit = self._scale(0, extra)[1]
+        print(
+            f"{self.display_name}[{self._mode}] time cost / loop: median {scale(result.median)}{unit}, "
+            f"min {scale(result.min)}{unit}, mean {scale(result.mean)}{unit}, stdev {scale(result.stdev)}{unit}, "
+            f"p95 {scale(result.p95)}{unit}, mad {scale(result.mad)}{unit}, {len(result.samples)} repeats"
+            f"{f', {result.outliers} outliers' if result.outliers else ''}, total time {result.total}s"
+        )
+
+
+def _print_lag(display_name: str, lag: LoopLag) -> None:
+    print(
+        f"{display_name}[loop lag] mean {lag.mean * 1000:.4g}ms, p95 {lag.p95 * 1000:.4g}ms, "
+        f"max {lag.max * 1000:.4g}ms, {lag.samples} ticks"
+    )
+
+
+async def atimeit(
+    func: Callable[..., Awaitable], 
+    *args: Any, 
+    calls: int = 100, 
+    concurrency: int = 1, 
+    warmup: int = 0, 
+    name: str = "", 
+    lag_interval: float = 0.001, 
+    verbose: bool = True, 
+    **kwargs: Any
+) -> TimeitResult:
+    '''
+    Benchmark an async function by awaiting `func(*args, **kwargs)` `calls` times, 
+    with at most `concurrency` calls in flight. The result holds the latency of 
+    every call as samples, its total is the wall time of all calls and its lag 
+    the event loop lag meanwhile.
+
+    Usage:
+    >>> result = await atimeit(fetch, url, calls = 1000, concurrency = 32)
+    [fetch][async] latency: median 1.87ms, p95 3.912ms, p99 5.03ms, max 7.411ms, 1000 calls, concurrency 32, 15203 calls/s
+    [fetch][loop lag] mean 0.0671ms, p95 0.2012ms, max 0.9634ms, 63 ticks
+    >>> result.percentile(99)
+    '''
+    calls, concurrency, warmup = int(calls), int(concurrency), int(warmup)
+    if calls < 1 or concurrency < 1 or warmup < 0:
+        raise ValueError("Parameter calls and concurrency must >= 1 and warmup must >= 0")
+    clock = time.perf_counter
+
+    async def run(number: int, samples: List[float]) -> None:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def timed_call() -> None:
+            async with semaphore:
+                st_time = clock()
+                await func(*args, **kwargs)
+                samples.append(clock() - st_time)
+
+        await asyncio.gather(*(timed_call() for _ in range(number)))
+
+    if warmup:
+        await run(warmup, [])
+    samples = []
+    monitor = _LagMonitor(float(lag_interval))
+    monitor.start()
+    st_time = clock()
+    try:
+        await run(calls, samples)
+    finally:
+        total = clock() - st_time
+        lag = await monitor.stop()
+    name = name or getattr(func, '__name__', '')
+    result = TimeitResult(name, 'async', calls, samples, total, lag=lag)
+    if verbose:
+        display_name = f'[{name}]'
+        print(
+            f"{display_name}[async] latency: median {result.median * 1000:.4g}ms, p95 {result.p95 * 1000:.4g}ms, "
+            f"p99 {result.percentile(99) * 1000:.4g}ms, max {result.max * 1000:.4g}ms, {calls} calls, "
+            f"concurrency {concurrency}, {calls / total if total else float('inf'):.0f} calls/s"
+        )
+        _print_lag(display_name, lag)
+    return result
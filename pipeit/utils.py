@@ -1,17 +1,22 @@
 from functools import partial
 from typing import Callable
 from .base import AbstractSelfModifiedClass , PipeManagerEnd
+from .wrapper import Map , Filter
+from .plan import Plan
 
-class PipeManager:
+class PipeContext:
+    '''
+    State of a single `PIPE | ... | END` evaluation.
+    '''
+
+    __slots__ = ('_storage' , )
 
     def __init__(self):
         self._storage = None
 
     def __or__(self , other):
         if isinstance(other , PipeManagerEnd):
-            ret = self._storage
-            self._storage = None
-            return ret
+            return self._storage
         elif isinstance(other , AbstractSelfModifiedClass):
             self._storage = other._exec(self._storage)
         elif isinstance(other , tuple):
@@ -22,5 +27,57 @@ class PipeManager:
             self._storage = other
         return self
 
+class LazyPipeContext:
+    '''
+    State of a `PIPE.lazy() | ... | END` evaluation. Stages are only recorded,
+    at `END` they are optimized as a `Plan` and applied to the source.
+    >>> PIPE.lazy() | records | Map(parse) | Filter(valid , independent = True) | Take(10) | list | END
+    '''
+
+    __slots__ = ('_source' , '_stages')
+
+    def __init__(self):
+        self._source = None
+        self._stages = []
+
+    def __or__(self , other):
+        if isinstance(other , PipeManagerEnd):
+            return self.plan().optimize()(self._source)
+        elif isinstance(other , (AbstractSelfModifiedClass , Plan)):
+            self._stages.append(other)
+        elif isinstance(other , tuple):
+            if len(other) == 2 and other[0] is map:
+                self._stages.append(Map(other[1]))
+            elif len(other) == 2 and other[0] is filter:
+                self._stages.append(Filter(other[1]))
+            else:
+                self._stages.append(partial(*other))
+        elif isinstance(other , Callable):
+            self._stages.append(other)
+        else:
+            # a new source discards whatever was chained before, like the eager mode
+            self._source = other
+            self._stages = []
+        return self
+
+    def plan(self):
+        return Plan(self._stages)
+
+    def explain(self):
+        return self.plan().explain()
+
+class PipeManager:
+    '''
+    Entry of the `PIPE | ... | END` syntax. The manager itself is stateless, every 
+    expression gets its own fresh `PipeContext`, so PIPE can be shared between
+    threads and asyncio tasks without any locking.
+    '''
+
+    def __or__(self , other):
+        return PipeContext() | other
+
+    def lazy(self):
+        return LazyPipeContext()
+
 PIPE = PipeManager()
-END = PipeManagerEnd()
\ No newline at end of file
+END = PipeManagerEnd()
@@ -0,0 +1,119 @@
+from itertools import islice
+from typing import Callable, Iterable, Iterator, Optional, Any
+from .base import AbstractSelfModifiedClass
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# chunk size used when a plain iterator has to be packed into arrays
+_DEFAULT_CHUNKSIZE = 65536
+
+
+class ArrayStream:
+    '''
+    Result of vectorized stages, a (possibly lazy) sequence of numpy array chunks.
+    Iterating it or piping it to `list` yields plain python objects, `toarray()` 
+    or `numpy.asarray()` give back a single array. Like other iterators it can 
+    only be consumed once.
+    '''
+
+    __slots__ = ('_chunks', )
+
+    def __init__(self, chunks: Iterable['np.ndarray']):
+        self._chunks = chunks
+
+    def chunks(self) -> Iterator['np.ndarray']:
+        return iter(self._chunks)
+
+    def __iter__(self) -> Iterator[Any]:
+        for chunk in self._chunks:
+            yield from chunk.tolist()
+
+    def tolist(self) -> list:
+        result = []
+        for chunk in self._chunks:
+            result.extend(chunk.tolist())
+        return result
+
+    def toarray(self) -> 'np.ndarray':
+        chunks = list(self._chunks)
+        if len(chunks) == 1:
+            return chunks[0]
+        if not chunks:
+            return np.array([])
+        return np.concatenate(chunks)
+
+    def __array__(self, dtype: Any = None, copy: Any = None) -> 'np.ndarray':
+        array = self.toarray()
+        return array if dtype is None else array.astype(dtype, copy=False)
+
+
+def _array_chunks(source: Any, chunksize: Optional[int]) -> Iterable['np.ndarray']:
+    if isinstance(source, ArrayStream):
+        return source._chunks
+    if isinstance(source, range):
+        if chunksize is None:
+            return (np.arange(source.start, source.stop, source.step), )
+        return (np.arange(sub.start, sub.stop, sub.step) for sub in (source[i:i + chunksize] for i in range(0, len(source), chunksize)))
+    if isinstance(source, np.ndarray) or hasattr(source, '__array__') or isinstance(source, (list, tuple)):
+        array = np.asarray(source)
+        if chunksize is None:
+            return (array, )
+        # slicing keeps views, no copy is made
+        return (array[i:i + chunksize] for i in range(0, len(array), chunksize))
+    return _pack_iterator(iter(source), chunksize or _DEFAULT_CHUNKSIZE)
+
+
+def _pack_iterator(it: Iterator, chunksize: int) -> Iterator['np.ndarray']:
+    while True:
+        chunk = list(islice(it, chunksize))
+        if not chunk:
+            return
+        yield np.array(chunk)
+
+
+class AbstractVectorStage(AbstractSelfModifiedClass):
+
+    def __init__(self, func: Callable, chunksize: Optional[int] = None):
+        if np is None:
+            raise ImportError("numpy is required by vectorized stages, try `pip install numpy`.")
+        if chunksize is not None and chunksize < 1:
+            raise ValueError("Parameter chunksize must >= 1")
+        self._func = func
+        self._storage = None
+        self._chunksize = chunksize
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._storage)
+
+
+class VMap(AbstractVectorStage):
+    '''
+    Apply `func` to whole arrays instead of single elements, e.g. a ufunc.
+    Usage:
+    >>> np.arange(10) | VMap(lambda a: 10 * a) | list
+    [0, 10, 20, 30, 40, 50, 60, 70, 80, 90]
+    # large inputs can be processed in fixed-size chunks
+    >>> range(10 ** 8) | VMap(np.sqrt, chunksize=1 << 20) | VFilter(lambda a: a > 100) | np.sum
+    Arrays are passed between vectorized stages without boxing elements, python 
+    objects are only produced when the result is iterated or piped to `list`.
+    '''
+
+    def _exec(self, _iter: Any) -> ArrayStream:
+        func = self._func
+        return ArrayStream(map(func, _array_chunks(_iter, self._chunksize)))
+
+
+class VFilter(AbstractVectorStage):
+    '''
+    `func` receives an array and returns a boolean mask of items to keep.
+    Usage:
+    >>> np.arange(10) | VFilter(lambda a: a % 3 != 0) | list
+    [1, 2, 4, 5, 7, 8]
+    '''
+
+    def _exec(self, _iter: Any) -> ArrayStream:
+        func = self._func
+        return ArrayStream(chunk[func(chunk)] for chunk in _array_chunks(_iter, self._chunksize))
@@ -0,0 +1,275 @@
+import time
+from collections import deque
+from typing import Callable, Iterable, Iterator, NamedTuple, Optional, Any
+from .base import AbstractSelfModifiedClass
+
+
+class WindowStats(NamedTuple):
+    '''
+    Aggregates of one window. `start` / `end` are element positions for count
+    based windows and timestamps for time based windows, the range is half open.
+    '''
+    start: Any
+    end: Any
+    count: int
+    sum: Any
+    min: Any
+    max: Any
+    mean: Optional[float]
+
+
+class _RollingAggregate:
+    '''
+    Sum / count / min / max of a FIFO window, all in amortized O(1) per element.
+    min and max are tracked with monotonic deques of (position, value). Floats 
+    are summed with Neumaier compensation, so values leaving the window don't 
+    take the precision of the remaining ones with them.
+    '''
+
+    __slots__ = ('_values', '_mins', '_maxs', '_pushed', '_popped', '_sum', '_comp')
+
+    def __init__(self):
+        self._values = deque()
+        self._mins = deque()
+        self._maxs = deque()
+        self._pushed = 0
+        self._popped = 0
+        self._sum = 0
+        self._comp = 0.0
+
+    @property
+    def sum(self) -> Any:
+        return self._sum + self._comp if self._comp else self._sum
+
+    def _add(self, value: Any) -> None:
+        total = self._sum
+        if not isinstance(value, float):
+            # ints, Fractions, Decimals... are exact already
+            self._sum = total + value
+            return
+        new_total = total + value
+        if abs(total) >= abs(value):
+            self._comp += (total - new_total) + value
+        else:
+            self._comp += (value - new_total) + total
+        self._sum = new_total
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def push(self, value: Any) -> None:
+        pos = self._pushed
+        self._pushed += 1
+        self._values.append(value)
+        self._add(value)
+        mins, maxs = self._mins, self._maxs
+        while mins and mins[-1][1] > value:
+            mins.pop()
+        mins.append((pos, value))
+        while maxs and maxs[-1][1] < value:
+            maxs.pop()
+        maxs.append((pos, value))
+
+    def pop(self) -> Any:
+        pos = self._popped
+        self._popped += 1
+        value = self._values.popleft()
+        if self._values:
+            self._add(-value)
+        else:
+            # start over from an exact zero once the window is empty
+            self._sum, self._comp = 0, 0.0
+        if self._mins[0][0] == pos:
+            self._mins.popleft()
+        if self._maxs[0][0] == pos:
+            self._maxs.popleft()
+        return value
+
+    def stats(self, start: Any, end: Any) -> WindowStats:
+        count = len(self._values)
+        if not count:
+            return WindowStats(start, end, 0, 0, None, None, None)
+        total = self.sum
+        return WindowStats(start, end, count, total, self._mins[0][1], self._maxs[0][1], total / count)
+
+
+class AbstractWindow(AbstractSelfModifiedClass):
+
+    def __init__(self, value: Optional[Callable] = None, stats: bool = True, partial: bool = False):
+        self._func = value
+        self._storage = None
+        self._stats = stats
+        self._partial = partial
+
+    def _exec(self, _iter: Iterable) -> Iterator:
+        return self._windows(iter(_iter))
+
+    def _windows(self, it: Iterator) -> Iterator:
+        raise NotImplementedError()
+
+
+class Tumbling(AbstractWindow):
+    '''
+    Non-overlapping windows of `n` elements.
+    Usage:
+    >>> range(10) | Tumbling(4) | Map(lambda w: w.sum) | list
+    [6, 22, 17]
+    # raw batches instead of aggregates
+    >>> range(10) | Tumbling(4, stats=False) | list
+    [(0, 1, 2, 3), (4, 5, 6, 7), (8, 9)]
+    `value` extracts the number to aggregate from each element, the trailing 
+    incomplete window is emitted unless `partial=False`.
+    '''
+
+    def __init__(self, n: int, value: Optional[Callable] = None, stats: bool = True, partial: bool = True):
+        if n < 1:
+            raise ValueError("Parameter n must >= 1")
+        super().__init__(value, stats, partial)
+        self._n = n
+
+    def _windows(self, it: Iterator) -> Iterator:
+        n, value = self._n, self._func
+        start = 0
+        if not self._stats:
+            buffer = []
+            for item in it:
+                buffer.append(item)
+                if len(buffer) == n:
+                    yield tuple(buffer)
+                    buffer = []
+            if buffer and self._partial:
+                yield tuple(buffer)
+            return
+        count, total, low, high = 0, 0, None, None
+        for item in it:
+            v = item if value is None else value(item)
+            if count:
+                total += v
+                if v < low:
+                    low = v
+                if v > high:
+                    high = v
+            else:
+                total, low, high = v, v, v
+            count += 1
+            if count == n:
+                yield WindowStats(start, start + n, n, total, low, high, total / n)
+                start += n
+                count = 0
+        if count and self._partial:
+            yield WindowStats(start, start + count, count, total, low, high, total / count)
+
+
+class Sliding(AbstractWindow):
+    '''
+    Windows of the last `n` elements, emitted every `step` elements.
+    Usage:
+    >>> range(6) | Sliding(3) | Map(lambda w: w.max) | list
+    [2, 3, 4, 5]
+    >>> range(6) | Sliding(3, step=2, stats=False) | list
+    [(0, 1, 2), (2, 3, 4)]
+    Aggregates are updated incrementally, so the cost per element doesn't 
+    depend on `n`. Only full windows are emitted unless `partial=True`.
+    '''
+
+    def __init__(self, n: int, step: int = 1, value: Optional[Callable] = None, stats: bool = True, partial: bool = False):
+        if n < 1 or step < 1:
+            raise ValueError("Parameter n and step must >= 1")
+        super().__init__(value, stats, partial)
+        self._n = n
+        self._step = step
+
+    def _windows(self, it: Iterator) -> Iterator:
+        n, step, value = self._n, self._step, self._func
+        pos = 0
+        if not self._stats:
+            buffer = deque(maxlen=n)
+            for item in it:
+                buffer.append(item)
+                pos += 1
+                if pos >= n and (pos - n) % step == 0:
+                    yield tuple(buffer)
+            if self._partial and 0 < pos < n:
+                yield tuple(buffer)
+            return
+        agg = _RollingAggregate()
+        for item in it:
+            agg.push(item if value is None else value(item))
+            pos += 1
+            if pos > n:
+                agg.pop()
+            if pos >= n and (pos - n) % step == 0:
+                yield agg.stats(pos - n, pos)
+        if self._partial and 0 < pos < n:
+            yield agg.stats(0, pos)
+
+
+class TimeWindow(AbstractWindow):
+    '''
+    Windows covering `size` seconds (or any unit of `time`), emitted every `step`.
+    Usage:
+    >>> events | TimeWindow(60, time=lambda e: e.ts, value=lambda e: e.latency) | list
+    # 5 minute windows sliding every minute
+    >>> events | TimeWindow(300, step=60, time=lambda e: e.ts, value=lambda e: e.latency)
+    Windows are aligned to multiples of `step` (which defaults to `size`), 
+    elements are expected in time order. Without `time` the arrival time is used.
+    Empty windows are skipped, the last open window is emitted unless `partial=False`.
+    '''
+
+    def __init__(
+        self, 
+        size: float, 
+        step: Optional[float] = None, 
+        time: Optional[Callable] = None, 
+        value: Optional[Callable] = None, 
+        stats: bool = True, 
+        partial: bool = True
+    ):
+        step = size if step is None else step
+        if size <= 0 or step <= 0 or step > size:
+            raise ValueError("Parameter size and step must > 0 and step must <= size")
+        super().__init__(value, stats, partial)
+        self._size = size
+        self._step = step
+        self._time = time
+
+    def _windows(self, it: Iterator) -> Iterator:
+        size, step, value = self._size, self._step, self._func
+        timeof = self._time or (lambda _: time.time())
+        agg = _RollingAggregate()
+        times = deque()
+        items = deque()
+        end = None
+
+        def evict(start):
+            while times and times[0] < start:
+                times.popleft()
+                if self._stats:
+                    agg.pop()
+                else:
+                    items.popleft()
+
+        def emit(start, end):
+            return agg.stats(start, end) if self._stats else tuple(items)
+
+        for item in it:
+            t = timeof(item)
+            if end is None:
+                end = (t // step + 1) * step
+            while t >= end:
+                evict(end - size)
+                if times:
+                    yield emit(end - size, end)
+                    end += step
+                else:
+                    # nothing left to report, jump to the window holding `t`
+                    end = (t // step + 1) * step
+            times.append(t)
+            if self._stats:
+                agg.push(item if value is None else value(item))
+            else:
+                items.append(item)
+        if end is not None and self._partial:
+            evict(end - size)
+            if times:
+                yield emit(end - size, end)
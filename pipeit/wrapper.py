@@ -1,8 +1,20 @@
 from typing import Callable
 from functools import reduce
-from .base import AbstractSelfModifiedClass
+from itertools import islice
+from .base import AbstractSelfModifiedClass , _MISSING
+from .parallel import _tree_reduce
 
 class Filter(AbstractSelfModifiedClass):
+    '''
+    `independent=True` declares that the predicate gives the same answer before 
+    and after the preceding 1:1 maps, which allows `Plan.optimize()` to run it 
+    ahead of them.
+    '''
+
+    def __init__(self , func , independent = False):
+        self._func = func
+        self._storage = None
+        self._independent = independent
 
     def _exec(self , _iter):
         return filter(self._func , _iter)
@@ -12,17 +24,112 @@ class Map(AbstractSelfModifiedClass):
     def _exec(self , _iter):
         return map(self._func , _iter)
 
+class Take(AbstractSelfModifiedClass):
+    '''
+    Usage:
+    >>> itertools.count() | Map(str) | Take(3) | list
+    ['0', '1', '2']
+    '''
+
+    def __init__(self , n):
+        if n < 0:
+            raise ValueError("Parameter n must >= 0")
+        self._func = None
+        self._storage = None
+        self._n = n
+
+    def _exec(self , _iter):
+        return islice(_iter , self._n)
+
 class Reduce(AbstractSelfModifiedClass):
+    '''
+    Usage:
+    >>> [1, 2, 3, 4, 5] | Reduce(lambda x, y: x + y, 0)
+    15
+    # associative operators can be reduced chunk by chunk on a pool of workers,
+    # partial results are then combined pairwise as a tree
+    >>> range(10 ** 7) | Reduce(operator.add, associative=True, workers=8)
+    # `combine` merges partial results when they differ from the items, every
+    # chunk then starts from `initializer`, which must be neutral for `combine`
+    >>> records | Reduce(lambda n, _: n + 1, 0, associative=True, combine=operator.add)
+    `executor` is 'process' (default), 'thread' or an Executor instance.
+    '''
 
-    def __init__(self , func , initializer = None):
+    def __init__(self , func , initializer = _MISSING , associative = False , workers = None , combine = None , chunksize = None , executor = 'process'):
+        if workers is not None and workers < 1:
+            raise ValueError("Parameter workers must >= 1")
+        if chunksize is not None and chunksize < 1:
+            raise ValueError("Parameter chunksize must >= 1")
         self._func = func
         self._storage = None
         self._initializer = initializer
+        self._associative = associative
+        self._workers = workers
+        self._combine = combine
+        self._chunksize = chunksize
+        self._executor = executor
 
     def _exec(self , _iter):
-        if self._initializer:
-            return reduce(self._func , _iter , self._initializer)
-        return reduce(self._func , _iter)
+        if self._associative:
+            return _tree_reduce(self._func , _iter , self._initializer , self._combine , self._workers , self._chunksize , self._executor)
+        if self._initializer is _MISSING:
+            return reduce(self._func , _iter)
+        return reduce(self._func , _iter , self._initializer)
 
     def __ror__(self , _iter):
         return self._exec(_iter)
+
+class Fused(AbstractSelfModifiedClass):
+    '''
+    Collapse consecutive Map / Filter stages into one generated loop.
+    Usage:
+    >>> range(10) | Fused(Filter(lambda x: x % 3), Map(lambda x: 10 * x)) | list
+    [10, 20, 40, 50, 70, 80]
+    # tuple style stages are accepted as well
+    >>> PIPE | range(10) | Fused((filter , lambda x: x % 3), (map , str)) | list | END
+    '''
+
+    def __init__(self , *stages):
+        self._steps = _fusible_steps(stages)
+        self._func = _fuse(self._steps)
+        self._storage = None
+
+    def _exec(self , _iter):
+        return self._func(_iter)
+
+def _fusible_steps(stages):
+    steps = []
+    for stage in stages:
+        if isinstance(stage , Fused):
+            steps.extend(stage._steps)
+        elif type(stage) in (Map , Filter):
+            steps.append((map if isinstance(stage , Map) else filter , stage._func))
+        elif isinstance(stage , tuple) and len(stage) == 2 and stage[0] in (map , filter):
+            steps.append(stage)
+        else:
+            raise TypeError(f"Stage {stage!r} can not be fused, only Map / Filter and (map|filter , func) are supported.")
+    return tuple(steps)
+
+def _fuse(steps):
+    # Build a single generator expression, e.g. Filter(g) | Map(f) | Filter(h) becomes
+    #   (_v1 for _v0 in _iter if _f0(_v0) for _v1 in (_f1(_v0),) if _f2(_v1))
+    # Map calls are nested inline and only bound to a new name when a filter needs
+    # the value, so the per-element cost is the same as a handwritten comprehension.
+    namespace = {}
+    clauses = []
+    var_no = 0
+    expr = '_v0'
+    for idx , (kind , func) in enumerate(steps):
+        name = f'_f{idx}'
+        namespace[name] = func
+        if kind is map:
+            expr = f'{name}({expr})'
+            continue
+        if expr != f'_v{var_no}':
+            var_no += 1
+            clauses.append(f'for _v{var_no} in ({expr},)')
+            expr = f'_v{var_no}'
+        clauses.append(f'if {expr}' if func is None else f'if {name}({expr})')
+    source = f"def _fused(_iter):\n    return ({expr} for _v0 in _iter {' '.join(clauses)})\n"
+    exec(compile(source , '<pipeit-fused>' , 'exec') , namespace)
+    return namespace['_fused']
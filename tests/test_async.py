@@ -0,0 +1,54 @@
+import os, sys
+sys.path.append(os.getcwd())
+import pytest
+import asyncio
+from pipeit import *
+
+async def arange(n):
+    for i in range(n):
+        await asyncio.sleep(0)
+        yield i
+
+async def double(x):
+    await asyncio.sleep(0.001)
+    return x * 2
+
+@pytest.mark.asyncio
+async def test_amap():
+    assert [x async for x in arange(10) | AMap(double)] == [x * 2 for x in range(10)]
+    assert [x async for x in range(10) | AMap(lambda x:x + 1)] == list(range(1 , 11))
+    assert [x async for x in range(100) | AMap(double , concurrency=20)] == [x * 2 for x in range(100)]
+    unordered = [x async for x in range(100) | AMap(double , concurrency=20 , ordered=False)]
+    assert sorted(unordered) == [x * 2 for x in range(100)]
+
+@pytest.mark.asyncio
+async def test_amap_concurrency():
+    running , peak = 0 , 0
+    async def track(x):
+        nonlocal running , peak
+        running += 1
+        peak = max(peak , running)
+        await asyncio.sleep(0.001)
+        running -= 1
+        return x
+    assert [x async for x in range(50) | AMap(track , concurrency=8)] == list(range(50))
+    assert peak == 8
+
+@pytest.mark.asyncio
+async def test_afilter_areduce():
+    async def odd(x):
+        await asyncio.sleep(0)
+        return x % 2
+    assert [x async for x in arange(10) | AFilter(odd , concurrency=4)] == [1 , 3 , 5 , 7 , 9]
+    assert await (arange(10) | AReduce(lambda x , y:x + y)) == 45
+    assert await (arange(10) | AMap(double , concurrency=4) | AFilter(odd) | AReduce(lambda x , y:x + y , 0)) == 0
+    assert await (PIPE | arange(5) | AMap(double) | AReduce(lambda x , y:x + y , 100) | END) == 120
+
+    flag = True
+    try:
+        for _ in range(3) | AMap(double):
+            ...
+        flag = False
+    except Exception as exc:
+        assert isinstance(exc , TypeError)
+    assert flag
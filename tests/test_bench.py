@@ -0,0 +1,34 @@
+import os, sys
+sys.path.append(os.getcwd())
+import pytest
+import json
+from pipeit import bench
+from pipeit.bench.__main__ import main
+
+def test_registry():
+    import pipeit.bench.cases
+    assert {'filter_map_reduce' , 'fused_chain' , 'pipe_long' , 'read' , 'write_pipe'} <= set(bench.registered())
+    assert bench.registered('^io[.]') == [name for name in bench.registered() if bench._registry[name]['group'] == 'io']
+
+    flag = True
+    try:
+        bench.benchmark(name='read')(lambda:None)
+        flag = False
+    except Exception as exc:
+        assert isinstance(exc , ValueError)
+    assert flag
+
+def test_run_and_compare(tmp_path , capsys):
+    output = str(tmp_path / 'result.json')
+    assert main(['-k' , 'pipe_short' , '-s' , '0.001' , '-r' , '2' , '-o' , output]) == 0
+    report = json.load(open(output))
+    assert list(report['results']) == ['pipe_short']
+    assert report['results']['pipe_short']['repeat'] == 2
+
+    # pretend the baseline was much faster
+    report['results']['pipe_short']['median'] /= 100
+    json.dump(report , open(output , 'w'))
+    assert main(['-k' , 'pipe_short' , '-s' , '0.001' , '-r' , '2' , '-b' , output]) == 1
+    assert 'REGRESSION' in capsys.readouterr().out
+    rows = bench.compare(report , report)
+    assert rows[0]['ratio'] == 1 and not rows[0]['regression']
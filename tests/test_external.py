@@ -0,0 +1,85 @@
+import os, sys
+sys.path.append(os.getcwd())
+import pytest
+import random
+import operator
+from pipeit import *
+
+def test_groupby():
+    assert (range(10) | GroupBy(lambda x:x % 3) | dict) == {0: [0 , 3 , 6 , 9] , 1: [1 , 4 , 7] , 2: [2 , 5 , 8]}
+    assert (range(10) | GroupBy(lambda x:x % 3 , agg=operator.add) | dict) == {0: 18 , 1: 12 , 2: 15}
+    assert (range(10) | GroupBy(lambda x:x % 3 , agg=lambda n , _:n + 1 , factory=int) | dict) == {0: 4 , 1: 3 , 2: 3}
+
+def test_groupby_spill():
+    data = [random.randint(0 , 10000) for _ in range(5000)]
+    expect = {}
+    for x in data:
+        expect.setdefault(x % 997 , []).append(x)
+    result = data | GroupBy(lambda x:x % 997 , memory_limit=500 , partitions=4) | dict
+    assert {k: sorted(v) for k , v in result.items()} == {k: sorted(v) for k , v in expect.items()}
+
+    counts = data | GroupBy(lambda x:x % 997 , agg=lambda n , _:n + 1 , factory=int , combine=operator.add , memory_limit=400) | dict
+    assert counts == {k: len(v) for k , v in expect.items()}
+
+    flag = True
+    try:
+        data | GroupBy(lambda x:x % 997 , agg=operator.add , memory_limit=100) | dict
+        flag = False
+    except Exception as exc:
+        assert isinstance(exc , ValueError)
+    assert flag
+
+def test_sort():
+    data = [random.randint(0 , 1000) for _ in range(5000)]
+    assert (data | Sort() | list) == sorted(data)
+    for kwargs in ({} , {'reverse': True} , {'key': lambda x:x % 7} , {'key': lambda x:-x , 'reverse': True}):
+        assert (data | Sort(memory_limit=300 , **kwargs) | list) == sorted(data , **kwargs)
+    pairs = [(random.randint(0 , 5) , i) for i in range(2000)]
+    # stable across runs
+    assert (pairs | Sort(key=lambda p:p[0] , memory_limit=100) | list) == sorted(pairs , key=lambda p:p[0])
+    assert ([] | Sort() | list) == []
+
+def test_topk():
+    data = [random.randint(0 , 1000) for _ in range(5000)]
+    assert (data | TopK(10)) == sorted(data , reverse=True)[:10]
+    assert (data | TopK(10 , largest=False)) == sorted(data)[:10]
+    assert (data | TopK(3 , key=lambda x:-x)) == sorted(data)[:3]
+    assert (PIPE | data | TopK(5) | END) == sorted(data , reverse=True)[:5]
+
+def test_join():
+    users = [(1 , 'ann') , (2 , 'bob')]
+    orders = [(1 , 'book') , (3 , 'pen') , (1 , 'cup')]
+    first = lambda r:r[0]
+    assert (orders | Join(users , first) | list) == [((1 , 'book') , (1 , 'ann')) , ((1 , 'cup') , (1 , 'ann'))]
+    assert (iter(orders) | Join(users , first , how='left') | list) == [((1 , 'book') , (1 , 'ann')) , ((3 , 'pen') , None) , ((1 , 'cup') , (1 , 'ann'))]
+    # built on the smaller (left) side, pairs keep their orientation
+    assert sorted([(2 , 'x')] | Join(orders + users , first) | list) == [((2 , 'x') , (2 , 'bob'))]
+
+def test_join_partitioned():
+    left = [(random.randint(0 , 300) , i) for i in range(3000)]
+    right = [(k , str(k)) for k in range(0 , 300 , 2)]
+    for how in ('inner' , 'left'):
+        expect = list(left | Join(right , lambda r:r[0] , how=how))
+        result = list(left | Join(right , lambda r:r[0] , how=how , partitions=4 , memory_limit=200))
+        assert sorted(result , key=repr) == sorted(expect , key=repr)
+
+def test_join_one_shot_other():
+    users = [(1 , 'ann') , (2 , 'bob')]
+    first = lambda r:r[0]
+    # a pipeline as the build side, joined by a reusable plan
+    plan = Join(users | Map(lambda u:u) , first) | list
+    assert plan([(1 , 'a')]) == [((1 , 'a') , (1 , 'ann'))]
+    assert plan([(2 , 'b')]) == [((2 , 'b') , (2 , 'bob'))]
+    plan = Join(iter(users) , first) | list
+    assert plan([(1 , 'a')]) == [((1 , 'a') , (1 , 'ann'))]
+    assert plan([(2 , 'b')]) == [((2 , 'b') , (2 , 'bob'))]
+
+    join = Join(iter(users) , first , partitions=2)
+    assert list([(1 , 'a')] | join) == [((1 , 'a') , (1 , 'ann'))]
+    flag = True
+    try:
+        list([(2 , 'b')] | join)
+        flag = False
+    except Exception as exc:
+        assert isinstance(exc , RuntimeError)
+    assert flag
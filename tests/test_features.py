@@ -56,9 +56,13 @@ def test_exec_order():
     assert flag
 
 def test_no_input():
+    # chaining without a source builds a plan
+    a = Map(lambda x:x+1) | Filter(lambda x:x<6) 
+    assert isinstance(a , Plan)
+
     flag = True
     try:
-        a = Map(lambda x:x+1) | Filter(lambda x:x<6) 
+        a = Map(lambda x:x+1) | (map , str)
         flag = False
     except Exception as exc:
         assert isinstance(exc , RuntimeError)
@@ -98,4 +102,154 @@ def test_misc1():
 
 def test_reduce():
     assert ([1,2,3,4,5] | Reduce(lambda x , y : x + y)) == 15
-    assert ([1,2,3,4,5] | Reduce(lambda x , y : x + y , 25)) == 40
\ No newline at end of file
+    assert ([1,2,3,4,5] | Reduce(lambda x , y : x + y , 25)) == 40
+
+
+def test_fused():
+    stages = (Filter(lambda x:x % 3) , Map(lambda x:10 * x) , Filter(lambda x:x > 20))
+    expect = range(20) | stages[0] | stages[1] | stages[2] | list
+    assert (range(20) | Fused(*stages) | list) == expect
+    assert (PIPE | range(20) | Fused((filter , lambda x:x % 3) , (map , lambda x:10 * x) , Filter(lambda x:x > 20)) | list | END) == expect
+    assert (range(5) | Fused(Map(str) , Map(int) , (filter , None)) | list) == [1 , 2 , 3 , 4]
+    assert (range(5) | Fused(Fused(Map(str)) , Map(len)) | Reduce(lambda x , y:x + y) | END) == 5
+
+    flag = True
+    try:
+        Fused(Reduce(lambda x , y:x + y))
+        flag = False
+    except Exception as exc:
+        assert isinstance(exc , TypeError)
+    assert flag
+
+def test_plan():
+    plan = Map(lambda x:x + 1) | Filter(lambda x:x % 2) | Reduce(lambda x , y:x + y)
+    assert (range(10) | plan) == 25
+    assert plan(range(5)) == 9
+    assert (PIPE | range(10) | plan | END) == 25
+    # reusable and extendable without touching the original
+    to_list = Map(str) | list
+    assert (range(3) | to_list) == ['0' , '1' , '2']
+    assert ([4 , 5] | to_list) == ['4' , '5']
+    assert len(to_list | len) == 3 and len(to_list) == 2
+    assert ((Filter(lambda x:x > 1) | to_list) | len)(range(5)) == 3
+    # a stage already used with a source still builds plans
+    m = Map(lambda x:x * 10)
+    assert (range(3) | m | list) == [0 , 10 , 20]
+    reused = m | Filter(lambda x:x > 0)
+    assert isinstance(reused , Plan) and list(range(3) | reused) == [10 , 20]
+    assert ([5] | m | list) == [50] and (range(3) | m | list) == [0 , 10 , 20]
+    # calling a stage applies it like `source | stage`
+    assert (Map(str)([1 , 2]) | list) == ['1' , '2']
+    assert (m(range(3)) | Filter(lambda x:x > 0) | list) == [10 , 20]
+
+    flag = True
+    try:
+        plan._stages = ()
+        flag = False
+    except Exception as exc:
+        assert isinstance(exc , AttributeError)
+    assert flag
+
+def test_plan_threads():
+    from concurrent.futures import ThreadPoolExecutor
+    plan = Map(lambda x:x * 2) | Filter(lambda x:x % 3) | list
+    with ThreadPoolExecutor(8) as executor:
+        results = list(executor.map(lambda n:range(n) | plan , range(200)))
+    assert results == [[x * 2 for x in range(n) if x * 2 % 3] for n in range(200)]
+
+def test_pipe_concurrency():
+    from concurrent.futures import ThreadPoolExecutor
+
+    def job(n):
+        return PIPE | range(n) | Map(lambda x:x * 2) | list | sum | END
+
+    # force frequent thread switches in the middle of expressions
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        with ThreadPoolExecutor(32) as executor:
+            results = list(executor.map(job , (n % 50 for n in range(5000))))
+    finally:
+        sys.setswitchinterval(interval)
+    assert results == [n % 50 * (n % 50 - 1) for n in range(5000)]
+
+def test_pipe_concurrency_asyncio():
+    import asyncio
+
+    async def job(n):
+        ctx = PIPE | range(n) | Map(lambda x:x + 1)
+        await asyncio.sleep(0)
+        return ctx | sum | END
+
+    async def main():
+        return await asyncio.gather(*(job(n) for n in range(2000)))
+
+    assert asyncio.run(main()) == [n * (n + 1) // 2 for n in range(2000)]
+
+def test_reduce_falsy_initializer():
+    assert ([] | Reduce(lambda x , y:x + y , 0)) == 0
+    assert ([[1] , [2]] | Reduce(lambda x , y:x + y , [])) == [1 , 2]
+    assert (['a' , 'b'] | Reduce(lambda x , y:x + y , '')) == 'ab'
+
+def test_distinct():
+    assert ([1 , 2 , 1 , 3 , 2] | Distinct() | list) == [1 , 2 , 3]
+    assert (['a' , 'B' , 'b' , 'A'] | Distinct(key=str.lower) | list) == ['a' , 'B']
+    # lru only remembers the most recent keys
+    assert ([1 , 2 , 3 , 1 , 3 , 3] | Distinct(mode='lru' , capacity=2) | list) == [1 , 2 , 3 , 1]
+
+    data = list(range(20000)) * 2
+    result = data | Distinct(mode='bloom' , capacity=20000 , error_rate=0.01) | list
+    # no false negatives, and false positives close to the configured rate
+    assert len(set(result)) == len(result)
+    assert 20000 * 0.97 < len(result) <= 20000
+
+def test_take():
+    import itertools
+    assert (itertools.count() | Map(str) | Take(3) | list) == ['0' , '1' , '2']
+    assert (PIPE | range(10) | Take(20) | list | END) == list(range(10))
+
+def test_plan_optimize():
+    calls = []
+    def fetch(x):
+        calls.append(x)
+        return x * 10
+
+    plan = ConcurrentMap(fetch , threads=4 , max_inflight=16) | Map(lambda x:x) | Take(5) | Take(3) | list
+    optimized = plan.optimize()
+    assert [type(stage) for stage in optimized._stages] == [Take , ConcurrentMap , type(list)]
+    assert optimized(range(100)) == plan(range(100)) == [0 , 10 , 20]
+    calls.clear()
+    optimized(range(100))
+    # the limit reaches the source, no work is read ahead
+    assert sorted(calls) == [0 , 1 , 2]
+
+    plan = Map(fetch) | Filter(lambda x:x % 2 , independent=True) | Filter(lambda x:x > 5) | list
+    assert [type(stage) for stage in plan.optimize()._stages] == [Filter , Map , Filter , type(list)]
+    assert plan.optimize()(range(10)) == [10 , 30 , 50 , 70 , 90]
+    assert 'Optimized plan' in plan.explain()
+
+def test_lazy_pipe():
+    import itertools
+    ctx = PIPE.lazy() | itertools.count() | (map , lambda x:x * 10) | Map(lambda x:x) | Take(3) | list
+    assert 'Take(3)' in ctx.explain()
+    assert (ctx | END) == [0 , 10 , 20]
+    assert (PIPE.lazy() | range(10) | Filter(lambda x:x % 2) | sum | END) == 25
+
+def test_profiled():
+    import time , json
+    def slow(x):
+        time.sleep(0.0005)
+        return x * 10
+    prof = Profiled(Filter(lambda x:x % 3) | Map(slow) | Reduce(lambda x , y:x + y))
+    assert (range(300) | prof) == (range(300) | Filter(lambda x:x % 3) | Map(lambda x:x * 10) | Reduce(lambda x , y:x + y) | END)
+    report = prof.report()
+    assert [stage['stage'] for stage in report['stages']] == ['Filter(<lambda>)' , 'Map(slow)' , 'Reduce(<lambda>)']
+    assert [(stage['items_in'] , stage['items_out']) for stage in report['stages']] == [(300 , 200) , (200 , 200) , (200 , 1)]
+    # the slow stage dominates
+    assert max(report['stages'] , key=lambda stage:stage['time'])['stage'] == 'Map(slow)'
+    assert abs(sum(stage['time'] for stage in report['stages']) - report['total_time']) < 1e-6
+    assert json.loads(prof.to_json())['stages'][1]['items_out'] == 200
+
+    prof = Profiled(Map(str) , list)
+    assert (iter(range(10)) | prof) == list(map(str , range(10)))
+    assert prof.report()['stages'][0]['items_in'] == 10
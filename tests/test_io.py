@@ -1,7 +1,7 @@
 import os, sys
 sys.path.append(os.getcwd())
 import pytest
-from pipeit import Read, Write, ReadB, WriteB, Map
+from pipeit import Read, Write, ReadB, WriteB, Map, Take
 import json
 
 def test_write_empty_text():
@@ -262,4 +262,150 @@ def test_shift():
 # test_write_encoding()
 # test_write_pipe()
 # test_read()
-# test_shift()
\ No newline at end of file
+# test_shift()
+
+
+def test_call_site_without_source():
+    # code compiled from a string has no source lines, like `python -c` or zipapps
+    Write('test.txt', 'abc')
+    namespace = {'Read': Read, 'Write': Write}
+    exec(compile("text = Read('test.txt')\nsize = Read('test.txt') | len\n'abcd' | Write('test.txt')\n", '<string>', 'exec'), namespace)
+    assert namespace['text'] == 'abc' and namespace['size'] == 3
+    assert Read('test.txt') == 'abcd'
+    for _ in range(3):
+        assert (Read('test.txt') 
+            | len) == 4
+
+def test_read_streams():
+    from pipeit import ReadLines, ReadLinesB, ReadChunks, ReadChunksB, Filter, END
+    Write('test.txt', 'a 1\nb 2\r\nc 3')
+    lines = ReadLines('test.txt')
+    assert lines | list == ['a 1\n', 'b 2\n', 'c 3']
+    # the file is opened again on every iteration
+    assert lines | Map(str.split) | Filter(lambda x: x[0] != 'b') | list == [['a', '1'], ['c', '3']]
+    assert ReadLines('test.txt', keepends=False) | list == ['a 1', 'b 2', 'c 3']
+    assert ReadLinesB('test.txt', keepends=False, buffering=4) | list == [b'a 1', b'b 2', b'c 3']
+    assert list(ReadLines('test.txt') | END) == list(ReadLines('test.txt') >> list)
+    assert ReadChunks('test.txt', 4) | list == ['a 1\n', 'b 2\n', 'c 3']
+    assert ReadChunksB('test.txt', size=5) | Map(len) | list == [5, 5, 2]
+    assert ReadChunksB('test.txt', 1 << 16) | list == [b'a 1\nb 2\r\nc 3']
+
+    flag = True
+    try:
+        ReadLinesB('test.txt', encoding='utf-8')
+        flag = False
+    except Exception as exc:
+        assert isinstance(exc, ValueError)
+    assert flag
+
+def test_readb_mmap():
+    import mmap, struct
+    WriteB('test.txt', struct.pack('<3i', 1, 2, 3))
+    mapped = ReadB('test.txt', mmap=True)
+    assert isinstance(mapped, mmap.mmap) and mapped[:] == ReadB('test.txt')
+    assert struct.unpack_from('<i', mapped, 4) == (2, )
+    assert ReadB('test.txt', mmap=True) | (lambda m: memoryview(m)[8:].tobytes()) == struct.pack('<i', 3)
+    mapped.close()
+    WriteB('test.txt', b'')
+    assert ReadB('test.txt', mmap=True) == b''
+
+    flag = True
+    try:
+        Read('test.txt', mmap=True)
+        flag = False
+    except Exception as exc:
+        assert isinstance(exc, ValueError)
+    assert flag
+
+def test_write_iterables():
+    from pipeit import ReadLines, ReadChunksB, PIPE, END
+    import array
+    assert Write('test.txt', (f'{i}\n' for i in range(3))) == 6
+    assert Read('test.txt') == '0\n1\n2\n'
+    assert range(3, 5) | Map(lambda x: f'{x}\n') | Write('test.txt', append=True) == 4
+    assert Read('test.txt') == '0\n1\n2\n3\n4\n'
+    assert ['a', 'b'] | Write('test.txt', buffering=1 << 20) == 2
+    assert PIPE | ['c', 'd'] | Write('test.txt', append=True) | END == 2
+    assert ReadLines('test.txt') | Map(str.upper) | list == ['ABCD']
+    assert Read('test.txt') | Map(str.upper) | ''.join == 'ABCD'
+    assert [b'\x00', bytearray(b'\x01\x02')] | WriteB('test.txt') == 3
+    assert ReadChunksB('test.txt', 1) | WriteB('test2.txt') == 3
+    assert ReadB('test2.txt') == b'\x00\x01\x02'
+    # buffers are counted in bytes, not items
+    assert [array.array('i', [1, 2])] | WriteB('test2.txt') == 2 * array.array('i').itemsize
+    assert len(ReadB('test2.txt')) == 2 * array.array('i').itemsize
+    os.remove('test2.txt')
+
+    flag = True
+    try:
+        123 | Write('test.txt')
+        flag = False
+    except Exception as exc:
+        assert isinstance(exc, TypeError)
+    assert flag and Read('test.txt') == '\x00\x01\x02'
+
+    # a wrong first chunk is rejected before the file is truncated
+    for sink, data in ((Write, [1, 2, 3]), (Write, [b'a']), (WriteB, ['a'])):
+        flag = True
+        try:
+            sink('test.txt', data)
+            flag = False
+        except Exception as exc:
+            assert isinstance(exc, TypeError)
+        assert flag and Read('test.txt') == '\x00\x01\x02'
+    assert Write('test.txt', iter(())) == 0 and Read('test.txt') == ''
+
+@pytest.mark.parametrize('ext', ['.gz', '.bz2', '.xz'])
+@pytest.mark.parametrize('threaded', [False, True])
+def test_compression(tmp_path, ext, threaded):
+    from pipeit import ReadLines, ReadChunksB
+    import gzip, bz2, lzma
+    path = str(tmp_path / ('data.txt' + ext))
+    lines = [f'line {i} 你好\n' for i in range(2000)]
+    assert Write(path, lines, threaded=threaded) == sum(map(len, lines))
+    opener = {'.gz': gzip.open, '.bz2': bz2.open, '.xz': lzma.open}[ext]
+    with opener(path, 'rt', encoding='utf-8') as f:
+        assert f.read() == ''.join(lines)
+    assert Read(path, threaded=threaded) == ''.join(lines)
+    assert ReadLines(path, threaded=threaded) | Take(3) | list == lines[:3]
+    assert ReadLines(path, keepends=False) | Map(len) | sum == sum(map(len, lines)) - len(lines)
+    # magic bytes are used when the extension doesn't tell
+    plain_name = str(tmp_path / 'data.bin')
+    os.rename(path, plain_name)
+    assert ReadB(plain_name, compression='auto') == ''.join(lines).encode('utf-8')
+    assert b''.join(ReadChunksB(plain_name, 1000, compression='auto', threaded=threaded)) == ''.join(lines).encode('utf-8')
+    assert len(ReadB(plain_name)) < len(''.join(lines).encode('utf-8'))
+
+    flag = True
+    try:
+        ReadB(plain_name, mmap=True, compression='auto')
+        flag = False
+    except Exception as exc:
+        assert isinstance(exc, ValueError)
+    assert flag
+
+def test_compression_opt_in(tmp_path):
+    import gzip
+    # magic bytes are only checked with compression='auto'
+    notes = str(tmp_path / 'notes.txt')
+    Write(notes, 'BZh is how bzip2 streams start')
+    assert Read(notes) == 'BZh is how bzip2 streams start'
+    payload = gzip.compress(b'hello')
+    blob = str(tmp_path / 'blob.bin')
+    WriteB(blob, payload)
+    assert ReadB(blob) == payload and ReadB(blob, compression='auto') == b'hello'
+    # binary files are left raw unless asked, even with a codec extension
+    archive = str(tmp_path / 'x.gz')
+    WriteB(archive, payload)
+    assert ReadB(archive) == payload and gzip.decompress(ReadB(archive)) == b'hello'
+    assert ReadB(archive, compression='infer') == b'hello'
+    Write(archive, 'text')
+    assert Read(archive) == 'text' and ReadB(archive) != b'text'
+
+    flag = True
+    try:
+        Write(archive, 'text', buffering=1 << 16)
+        flag = False
+    except Exception as exc:
+        assert isinstance(exc, ValueError)
+    assert flag
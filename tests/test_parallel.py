@@ -0,0 +1,113 @@
+import os, sys
+sys.path.append(os.getcwd())
+import pytest
+import itertools
+import multiprocessing
+from pipeit import *
+
+def square(x):
+    return x * x
+
+def increment(x):
+    return x + 1
+
+def test_parallel_map():
+    assert (range(100) | ParallelMap(square , workers=2) | list) == list(map(square , range(100)))
+    assert (PIPE | range(100) | ParallelMap(square , workers=2 , chunksize=7) | list | END) == list(map(square , range(100)))
+    assert sorted(range(1000) | ParallelMap(square , ordered=False) | list) == list(map(square , range(1000)))
+    assert (range(10) | Filter(lambda x:x % 2) | ParallelMap(increment , workers=2) | list) == [2 , 4 , 6 , 8 , 10]
+
+def test_parallel_map_unbounded():
+    # an infinite source must be consumed lazily
+    results = itertools.count() | ParallelMap(square , workers=2)
+    assert list(itertools.islice(results , 1000)) == list(map(square , range(1000)))
+
+def test_parallel_map_reuse_executor():
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(2) as executor:
+        plan = ParallelMap(square , executor=executor) | list
+        assert plan(range(10)) == plan(range(10)) == list(map(square , range(10)))
+
+@pytest.mark.skipif('fork' not in multiprocessing.get_all_start_methods() , reason="fork start method required")
+def test_parallel_map_lambda_without_cloudpickle(monkeypatch):
+    monkeypatch.setitem(sys.modules , 'cloudpickle' , None)
+    stage = ParallelMap(lambda x:x * 3 , workers=2 , mp_context=multiprocessing.get_context('fork'))
+    assert (range(20) | stage | list) == [x * 3 for x in range(20)]
+
+@pytest.mark.skipif('fork' not in multiprocessing.get_all_start_methods() , reason="fork start method required")
+def test_parallel_map_lambda_external_executor(monkeypatch):
+    from concurrent.futures import ProcessPoolExecutor
+    monkeypatch.setitem(sys.modules , 'cloudpickle' , None)
+    fork = multiprocessing.get_context('fork')
+    with ProcessPoolExecutor(2 , mp_context=fork) as executor:
+        # workers are already running, they can't inherit the lambda
+        assert (range(10) | ParallelMap(square , executor=executor) | list) == list(map(square , range(10)))
+        flag = True
+        try:
+            range(10) | ParallelMap(lambda x:x * 3 , executor=executor , mp_context=fork) | list
+            flag = False
+        except Exception as exc:
+            assert isinstance(exc , TypeError)
+        assert flag
+
+def test_parallel_map_args():
+    for kwargs in ({'workers': 0} , {'chunksize': 0}):
+        flag = True
+        try:
+            ParallelMap(square , **kwargs)
+            flag = False
+        except Exception as exc:
+            assert isinstance(exc , ValueError)
+        assert flag
+
+def test_concurrent_map():
+    import time , random
+    def fetch(x):
+        time.sleep(random.random() / 1000)
+        return x * 2
+    assert (range(200) | ConcurrentMap(fetch , threads=16) | list) == [x * 2 for x in range(200)]
+    assert (PIPE | range(200) | ConcurrentMap(fetch , threads=16) | list | END) == [x * 2 for x in range(200)]
+    assert sorted(range(200) | ConcurrentMap(fetch , threads=16 , ordered=False) | list) == [x * 2 for x in range(200)]
+
+def test_concurrent_map_backpressure():
+    pulled = []
+    def source():
+        for i in itertools.count():
+            pulled.append(i)
+            yield i
+
+    results = source() | ConcurrentMap(square , threads=2 , max_inflight=4)
+    assert list(itertools.islice(results , 10)) == list(map(square , range(10)))
+    # only the in-flight window is read ahead of the consumer
+    assert len(pulled) <= 10 + 4
+
+def test_concurrent_map_error():
+    def fail(x):
+        if x == 5:
+            raise KeyError(x)
+        return x
+    flag = True
+    try:
+        range(10) | ConcurrentMap(fail , threads=4) | list
+        flag = False
+    except Exception as exc:
+        assert isinstance(exc , KeyError)
+    assert flag
+
+def test_parallel_reduce():
+    import operator
+    assert (range(10000) | Reduce(operator.add , associative=True , workers=2)) == sum(range(10000))
+    assert (range(10) | Reduce(operator.add , 25 , associative=True , workers=2 , chunksize=3)) == 70
+    # order of chunks is kept for associative but not commutative operators
+    assert (map(str , range(50)) | Reduce(operator.add , associative=True , chunksize=4 , executor='thread') | END) == ''.join(map(str , range(50)))
+    # partial results of another type are merged with combine
+    assert (range(1000) | Reduce(lambda n , _:n + 1 , 0 , associative=True , combine=operator.add , executor='thread')) == 1000
+    assert ([] | Reduce(operator.add , 0 , associative=True , executor='thread')) == 0
+
+    flag = True
+    try:
+        [] | Reduce(operator.add , associative=True , executor='thread')
+        flag = False
+    except Exception as exc:
+        assert isinstance(exc , TypeError)
+    assert flag
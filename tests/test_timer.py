@@ -0,0 +1,171 @@
+import os, sys
+sys.path.append(os.getcwd())
+import pytest
+import gc
+from pipeit import *
+
+def test_timeit_output(capsys):
+    for _ in timeit(1000 , name='loop'):
+        ''.join(['1'] * 10)
+    with timeit(name='block'):
+        sum(range(1000))
+    out = capsys.readouterr().out
+    assert '[loop][approximate] time cost / loop:' in out and 'ms' in out
+    assert '[block][exact] time cost:' in out
+
+def test_timeit_repeat(capsys):
+    count = 0
+    t = timeit(100 , repeat=5 , warmup=2 , verbose=False)
+    for _ in t:
+        count += 1
+    assert count == 100 * 7
+    assert capsys.readouterr().out == ''
+    result = t.result
+    assert isinstance(result , TimeitResult)
+    assert len(result.samples) == 5 and result.loops == 100
+    assert result.min <= result.median <= result.p95 <= result.max
+    stats = result.to_dict()
+    assert stats['repeat'] == 5 and set(('min' , 'median' , 'mean' , 'stdev' , 'p95' , 'mad')) <= set(stats)
+
+def test_timeit_disable_gc():
+    assert gc.isenabled()
+    t = timeit(10 , disable_gc=True , verbose=False)
+    for _ in t:
+        assert not gc.isenabled()
+    assert gc.isenabled()
+    with timeit(disable_gc=True , verbose=False) as t:
+        assert not gc.isenabled()
+    assert gc.isenabled() and len(t.result.samples) == 1
+
+    # leaving the loop early restores the collector as well
+    for _ in timeit(100 , disable_gc=True , verbose=False):
+        break
+    assert gc.isenabled()
+    try:
+        for _ in timeit(100 , disable_gc=True , verbose=False):
+            raise KeyError()
+    except KeyError:
+        pass
+    assert gc.isenabled()
+
+    flag = True
+    try:
+        with timeit(repeat=3):
+            ...
+        flag = False
+    except Exception as exc:
+        assert isinstance(exc , ValueError)
+    assert flag
+
+def test_timeit_exact_loops(capsys):
+    calls = []
+    a = 3
+    with timeit(1000 , exact_loops=True) as t:
+        calls.append(a + 1)
+    assert calls == [4] * 1000
+    assert t.result.mode == 'exact_loops' and t.result.loops == 1000
+    assert '[exact_loops]' in capsys.readouterr().out
+
+    seen = []
+    for i in timeit(10 , repeat=3 , warmup=1 , exact_loops=True , verbose=False):
+        seen.append(i)
+    assert seen == list(range(10)) * 4
+
+    flag = True
+    try:
+        with timeit(10 , exact_loops=True , verbose=False):
+            b = undefined_local
+        undefined_local = 0
+        flag = False
+    except Exception as exc:
+        assert isinstance(exc , NameError)
+    assert flag
+
+def test_timeit_exact_loops_temporaries():
+    # names only assigned inside the timed body are not read from the caller
+    with timeit(100 , exact_loops=True , verbose=False):
+        tmp = [1 , 2]
+        n = len(tmp)
+    for _ in timeit(10 , exact_loops=True , verbose=False):
+        total = 0
+        total += 1
+    data = [1 , 2 , 3]
+    with timeit(10 , exact_loops=True , verbose=False):
+        x = [i for i in data]
+
+def test_timeit_exact_loops_module_level(tmp_path):
+    import runpy
+    script = tmp_path / 'script.py'
+    script.write_text(
+        'from pipeit import timeit\n'
+        'x = 0\n'
+        'with timeit(1000 , exact_loops=True , verbose=False):\n'
+        '    x += 1\n'
+        'for i in timeit(10 , exact_loops=True , verbose=False):\n'
+        '    last = i\n'
+    )
+    namespace = runpy.run_path(str(script))
+    assert namespace['x'] == 1000 and namespace['last'] == 9
+
+def test_timeit_memory(capsys):
+    import tracemalloc
+    with timeit(memory=True , memory_top=3) as t:
+        bar = [[i] for i in range(10000)]
+    memory = t.result.memory
+    assert isinstance(memory , MemoryUsage)
+    assert memory.peak >= memory.net > 10000 * 50 and memory.blocks >= 10000
+    assert memory.per_loop == memory.net
+    location , size , count = memory.top[0]
+    assert 'test_timer.py' in location and size > 10000 * 50 and count >= 10000
+    assert t.result.to_dict()['memory']['peak'] == memory.peak
+    assert '[memory] peak' in capsys.readouterr().out
+    assert not tracemalloc.is_tracing()
+
+    keep = []
+    t = timeit(100 , repeat=2 , memory=True , verbose=False)
+    for _ in t:
+        keep.append(bytearray(1000))
+    assert t.result.memory.per_loop >= 1000 and t.result.memory.top == []
+
+    # tracing stops when the timed loop is left early
+    for _ in timeit(100 , memory=True , verbose=False):
+        break
+    assert not tracemalloc.is_tracing()
+    try:
+        with timeit(10 , exact_loops=True , memory=True , verbose=False):
+            raise KeyError()
+    except KeyError:
+        pass
+    assert not tracemalloc.is_tracing()
+
+@pytest.mark.asyncio
+async def test_timeit_async(capsys):
+    import asyncio, time
+    async with timeit(lag_interval=0.001) as t:
+        await asyncio.sleep(0.02)
+        time.sleep(0.02)
+        await asyncio.sleep(0.01)
+    assert t.result.total >= 0.05
+    assert isinstance(t.result.lag , LoopLag) and t.result.lag.max >= 0.015
+    out = capsys.readouterr().out
+    assert '[exact] time cost' in out and '[loop lag]' in out
+
+    in_flight = []
+    async def job(delay):
+        in_flight.append(1)
+        assert len(in_flight) <= 4
+        await asyncio.sleep(delay)
+        in_flight.pop()
+    result = await atimeit(job , 0.005 , calls=20 , concurrency=4 , warmup=2 , verbose=False)
+    assert result.mode == 'async' and len(result.samples) == 20
+    assert result.min >= 0.004 and result.total < 20 * 0.005
+    assert result.to_dict()['lag']['samples'] > 0
+
+    flag = True
+    try:
+        async with timeit(repeat=3):
+            ...
+        flag = False
+    except Exception as exc:
+        assert isinstance(exc , ValueError)
+    assert flag
@@ -0,0 +1,38 @@
+import os, sys
+sys.path.append(os.getcwd())
+import pytest
+from pipeit import *
+
+np = pytest.importorskip('numpy')
+
+def test_vmap_vfilter():
+    assert (np.arange(10) | VMap(lambda a:10 * a) | list) == list(range(0 , 100 , 10))
+    assert (np.arange(10) | VFilter(lambda a:a % 3 != 0) | list) == [1 , 2 , 4 , 5 , 7 , 8]
+    foo = list(range(100))
+    expect = foo | Filter(lambda x:x % 3) | Map(lambda x:10 * x) | Reduce(lambda x , y:x + y) | END
+    assert (foo | VFilter(lambda a:a % 3 != 0) | VMap(lambda a:10 * a) | np.sum) == expect
+    assert (PIPE | range(100) | VFilter(lambda a:a % 3 != 0) | VMap(lambda a:10 * a) | sum | END) == expect
+
+def test_vector_chunks():
+    for source in (range(1000) , np.arange(1000) , iter(range(1000))):
+        result = source | VMap(lambda a:a * 2 , chunksize=64) | VFilter(lambda a:a % 3 == 0)
+        assert list(result) == [x * 2 for x in range(1000) if x * 2 % 3 == 0]
+    chunks = list((range(1000) | VMap(np.sqrt , chunksize=100) | END).chunks())
+    assert len(chunks) == 10 and all(isinstance(chunk , np.ndarray) for chunk in chunks)
+
+def test_vector_output_types():
+    # python objects at list, arrays at END
+    assert all(type(x) is int for x in (range(5) | VMap(lambda a:a + 1) | list))
+    result = PIPE | range(5) | VMap(lambda a:a + 1) | END
+    assert isinstance(result , ArrayStream)
+    assert np.array_equal(np.asarray(result) , np.arange(1 , 6))
+    assert (np.arange(5) | Map(lambda x:x + 1) | list) == [1 , 2 , 3 , 4 , 5]
+
+def test_ndarray_into_plan_and_sinks(tmp_path):
+    plan = Map(lambda x:int(x) * 2) | list
+    assert (np.arange(3) | plan) == [0 , 2 , 4]
+    prof = Profiled(Map(lambda x:int(x) + 1) , sum)
+    assert (np.arange(3) | prof) == 6
+    path = str(tmp_path / 'rows.txt')
+    assert (np.array(['a' , 'b']) | Write(path)) == 2
+    assert Read(path) == 'ab'
@@ -0,0 +1,52 @@
+import os, sys
+sys.path.append(os.getcwd())
+import pytest
+import random
+from pipeit import *
+
+def brute_force(values , start , end):
+    window = values[start:end]
+    return WindowStats(start , end , len(window) , sum(window) , min(window) , max(window) , sum(window) / len(window))
+
+def test_tumbling():
+    assert (range(10) | Tumbling(4) | Map(lambda w:w.sum) | list) == [6 , 22 , 17]
+    assert (range(10) | Tumbling(4 , partial=False) | Map(lambda w:w.sum) | list) == [6 , 22]
+    assert (range(10) | Tumbling(4 , stats=False) | list) == [(0 , 1 , 2 , 3) , (4 , 5 , 6 , 7) , (8 , 9)]
+    values = [random.randint(-100 , 100) for _ in range(1000)]
+    assert (values | Tumbling(7) | list) == [brute_force(values , i , min(i + 7 , 1000)) for i in range(0 , 1000 , 7)]
+
+def test_sliding():
+    values = [random.randint(-100 , 100) for _ in range(1000)]
+    for n , step in ((1 , 1) , (10 , 1) , (10 , 3) , (50 , 50)):
+        expect = [brute_force(values , i , i + n) for i in range(0 , 1000 - n + 1 , step)]
+        assert (values | Sliding(n , step) | list) == expect
+    assert (range(6) | Sliding(3 , step=2 , stats=False) | list) == [(0 , 1 , 2) , (2 , 3 , 4)]
+    assert (range(2) | Sliding(3) | list) == []
+    assert (range(2) | Sliding(3 , partial=True) | Map(lambda w:w.count) | list) == [2]
+    records = [{'v': i} for i in range(5)]
+    assert (records | Sliding(2 , value=lambda r:r['v']) | Map(lambda w:w.mean) | list) == [0.5 , 1.5 , 2.5 , 3.5]
+
+def test_time_window():
+    events = [(0 , 1) , (10 , 2) , (59 , 3) , (61 , 4) , (200 , 5) , (250 , 6)]
+    result = events | TimeWindow(60 , time=lambda e:e[0] , value=lambda e:e[1]) | list
+    assert [(w.start , w.end , w.sum , w.max) for w in result] == [(0 , 60 , 6 , 3) , (60 , 120 , 4 , 4) , (180 , 240 , 5 , 5) , (240 , 300 , 6 , 6)]
+    result = events | TimeWindow(120 , step=60 , time=lambda e:e[0] , stats=False) | Map(lambda w:[e[1] for e in w]) | list
+    assert result == [[1 , 2 , 3] , [1 , 2 , 3 , 4] , [4] , [5] , [5 , 6]]
+
+    flag = True
+    try:
+        TimeWindow(60 , step=120)
+        flag = False
+    except Exception as exc:
+        assert isinstance(exc , ValueError)
+    assert flag
+
+def test_window_float_sum():
+    # a large value leaving the window must not wipe out the small ones
+    result = [1e20 , 1.0 , 1.0 , 1.0] | Sliding(2) | list
+    assert [w.sum for w in result] == [1e20 , 2.0 , 2.0]
+    assert [w.mean for w in result][1:] == [1.0 , 1.0]
+    values = [0.1] * 1000 + [1e16 , -1e16] + [0.1] * 1000
+    result = values | Sliding(10) | Map(lambda w:w.sum) | list
+    assert abs(result[-1] - 1.0) < 1e-12
+    assert [w.sum for w in range(5) | Sliding(2) | list] == [1 , 3 , 5 , 7]